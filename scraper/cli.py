@@ -4,20 +4,51 @@ Job Scraper CLI - Command line interface for the job scraping engine
 """
 
 import argparse
-import asyncio
 import json
 import os
 import sys
+from contextlib import closing
 from datetime import datetime
 from typing import List, Optional
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from scraper import JobScraper, Company, ProxyConfig, load_companies_from_json, load_proxies_from_json, DatabaseManager
+# Scraper components are imported inside each command so that cheap commands
+# (--help, list, config) don't pay for loading the HTTP/parsing stack.
 
-def create_parser():
-    """Create command line argument parser"""
+COMMANDS = ('scrape', 'status', 'list', 'clean', 'export', 'config')
+
+# ~20 MB page cache for the read-heavy status/export connections
+PRAGMA_READ_CACHE = "PRAGMA cache_size=-20000"
+
+STATUS_JOBS_SQL = """
+    SELECT COUNT(*),
+           COALESCE(SUM(CASE WHEN scraped_at > datetime('now', '-24 hours') THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN scraped_at > datetime('now', '-7 days') THEN 1 ELSE 0 END), 0)
+    FROM jobs
+"""
+
+STATUS_BY_COMPANY_SQL = "SELECT company, COUNT(*) FROM jobs GROUP BY company ORDER BY COUNT(*) DESC LIMIT 10"
+
+STATUS_SCRAPES_SQL = """
+    SELECT COALESCE(SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END), 0)
+    FROM scrape_logs
+    WHERE completed_at > datetime('now', '-24 hours')
+"""
+
+def _sniff_subcommand(argv: List[str]) -> Optional[str]:
+    """Return the subcommand named on the command line, if any"""
+    if argv and argv[0] in COMMANDS:
+        return argv[0]
+    return None
+
+def create_parser(command: Optional[str] = None):
+    """Create command line argument parser
+
+    When ``command`` is given only that subcommand's parser is registered.
+    """
     parser = argparse.ArgumentParser(
         description="Job Portal Scraping Engine CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -34,42 +65,54 @@ Examples:
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Scrape command
-    scrape_parser = subparsers.add_parser('scrape', help='Start scraping jobs')
-    scrape_parser.add_argument('--companies', nargs='+', help='Specific companies to scrape')
-    scrape_parser.add_argument('--all', action='store_true', help='Scrape all configured companies')
-    scrape_parser.add_argument('--with-proxies', action='store_true', help='Use proxy rotation')
-    scrape_parser.add_argument('--max-concurrent', type=int, default=3, help='Max concurrent scrapes')
-    scrape_parser.add_argument('--output', help='Output file for results')
+    if command in (None, 'scrape'):
+        scrape_parser = subparsers.add_parser('scrape', help='Start scraping jobs')
+        scrape_parser.add_argument('--companies', nargs='+', help='Specific companies to scrape')
+        scrape_parser.add_argument('--all', action='store_true', help='Scrape all configured companies')
+        scrape_parser.add_argument('--with-proxies', action='store_true', help='Use proxy rotation')
+        scrape_parser.add_argument('--max-concurrent', type=int, default=3, help='Max concurrent scrapes')
+        scrape_parser.add_argument('--max-connections', type=int, default=0, help='Max open HTTP connections (0 = unlimited)')
+        scrape_parser.add_argument('--per-host', type=int, default=3, help='Max open HTTP connections per host')
+        scrape_parser.add_argument('--output', help='Output file for results')
+        scrape_parser.add_argument('--profile', metavar='FILE',
+                                   help='Profile the scrape with cProfile (parsing runs inline) and save stats to FILE')
     
     # Status command
-    status_parser = subparsers.add_parser('status', help='Show scraping status and statistics')
-    status_parser.add_argument('--detailed', action='store_true', help='Show detailed statistics')
+    if command in (None, 'status'):
+        status_parser = subparsers.add_parser('status', help='Show scraping status and statistics')
+        status_parser.add_argument('--detailed', action='store_true', help='Show detailed statistics')
     
     # List command
-    list_parser = subparsers.add_parser('list', help='List configured companies')
-    list_parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
+    if command in (None, 'list'):
+        list_parser = subparsers.add_parser('list', help='List configured companies')
+        list_parser.add_argument('--format', choices=['table', 'json'], default='table', help='Output format')
     
     # Clean command
-    clean_parser = subparsers.add_parser('clean', help='Clean old data')
-    clean_parser.add_argument('--days', type=int, default=90, help='Remove jobs older than N days')
-    clean_parser.add_argument('--logs', action='store_true', help='Also clean scrape logs')
+    if command in (None, 'clean'):
+        clean_parser = subparsers.add_parser('clean', help='Clean old data')
+        clean_parser.add_argument('--days', type=int, default=90, help='Remove jobs older than N days')
+        clean_parser.add_argument('--logs', action='store_true', help='Also clean scrape logs')
     
     # Export command
-    export_parser = subparsers.add_parser('export', help='Export jobs data')
-    export_parser.add_argument('--format', choices=['json', 'csv'], default='json', help='Export format')
-    export_parser.add_argument('--output', required=True, help='Output file')
-    export_parser.add_argument('--company', help='Filter by company')
-    export_parser.add_argument('--days', type=int, help='Jobs from last N days')
+    if command in (None, 'export'):
+        export_parser = subparsers.add_parser('export', help='Export jobs data')
+        export_parser.add_argument('--format', choices=['json', 'csv'], default='json', help='Export format')
+        export_parser.add_argument('--output', required=True, help='Output file')
+        export_parser.add_argument('--company', help='Filter by company')
+        export_parser.add_argument('--days', type=int, help='Jobs from last N days')
     
     # Config command
-    config_parser = subparsers.add_parser('config', help='Manage configuration')
-    config_parser.add_argument('--show', action='store_true', help='Show current configuration')
-    config_parser.add_argument('--validate', action='store_true', help='Validate configuration files')
+    if command in (None, 'config'):
+        config_parser = subparsers.add_parser('config', help='Manage configuration')
+        config_parser.add_argument('--show', action='store_true', help='Show current configuration')
+        config_parser.add_argument('--validate', action='store_true', help='Validate configuration files')
     
     return parser
 
 async def scrape_command(args):
     """Handle scrape command"""
+    from scraper import JobScraper, load_companies_from_json, load_proxies_from_json, write_json_array
+    
     print("🕸️  Starting job scraping...")
     
     # Load companies
@@ -79,8 +122,8 @@ async def scrape_command(args):
             print("❌ No companies found in companies.json")
             return 1
     elif args.companies:
-        all_companies = load_companies_from_json('companies.json')
-        companies = [c for c in all_companies if c.name in args.companies]
+        wanted = set(args.companies)
+        companies = [c for c in load_companies_from_json('companies.json') if c.name in wanted]
         if not companies:
             print(f"❌ No matching companies found for: {args.companies}")
             return 1
@@ -100,29 +143,23 @@ async def scrape_command(args):
     print(f"🎯 Scraping {len(companies)} companies...")
     
     # Run scraping
-    results = {}
     try:
-        async with JobScraper(companies, proxies) as scraper:
-            results = await scraper.scrape_all_companies()
+        async with JobScraper(companies, proxies,
+                              max_connections=args.max_connections,
+                              max_connections_per_host=args.per_host,
+                              parse_workers=0 if args.profile else None) as scraper:
+            results = await scraper.scrape_all_companies(max_concurrent=args.max_concurrent)
         
         # Display results
-        total_jobs = 0
-        for company_name, jobs in results.items():
-            job_count = len(jobs)
-            total_jobs += job_count
+        for company_name, job_count in results.counts.items():
             status = "✅" if job_count > 0 else "⚠️"
             print(f"{status} {company_name}: {job_count} jobs")
         
-        print(f"\n🎉 Scraping completed! Total jobs found: {total_jobs}")
+        print(f"\n🎉 Scraping completed! Total jobs found: {results.total}")
         
         # Save results if output specified
         if args.output:
-            all_jobs = []
-            for jobs in results.values():
-                all_jobs.extend([job.__dict__ for job in jobs])
-            
-            with open(args.output, 'w') as f:
-                json.dump(all_jobs, f, indent=2, default=str)
+            write_json_array(args.output, (job.to_dict() for job in results.all_jobs()))
             print(f"💾 Results saved to {args.output}")
         
         return 0
@@ -131,42 +168,47 @@ async def scrape_command(args):
         print(f"❌ Scraping failed: {e}")
         return 1
 
+def profile_command(command, args):
+    """Run an async command under cProfile, save the stats and print the hottest calls"""
+    import asyncio
+    import cProfile
+    import pstats
+    
+    profiler = cProfile.Profile()
+    result = profiler.runcall(asyncio.run, command(args))
+    profiler.dump_stats(args.profile)
+    
+    print(f"\n⏱️  Profile saved to {args.profile}; top functions by cumulative time:")
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    return result
+
 def status_command(args):
     """Handle status command"""
     print("📊 Job Scraping Status")
     print("=" * 50)
     
     try:
-        db = DatabaseManager()
-        
-        # Get basic statistics
         import sqlite3
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
-        
-        # Total jobs
-        cursor.execute("SELECT COUNT(*) FROM jobs")
-        total_jobs = cursor.fetchone()[0]
-        
-        # Jobs by company
-        cursor.execute("SELECT company, COUNT(*) FROM jobs GROUP BY company ORDER BY COUNT(*) DESC")
-        jobs_by_company = cursor.fetchall()
-        
-        # Recent activity
-        cursor.execute("SELECT COUNT(*) FROM jobs WHERE scraped_at > datetime('now', '-24 hours')")
-        jobs_last_24h = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM jobs WHERE scraped_at > datetime('now', '-7 days')")
-        jobs_last_week = cursor.fetchone()[0]
+        from scraper import DatabaseManager
         
-        # Scrape logs
-        cursor.execute("SELECT COUNT(*) FROM scrape_logs WHERE status = 'success' AND completed_at > datetime('now', '-24 hours')")
-        successful_scrapes_24h = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM scrape_logs WHERE status = 'failed' AND completed_at > datetime('now', '-24 hours')")
-        failed_scrapes_24h = cursor.fetchone()[0]
+        db = DatabaseManager()
         
-        conn.close()
+        # Get basic statistics
+        with closing(sqlite3.connect(db.db_path)) as conn:
+            conn.execute(PRAGMA_READ_CACHE)
+            cursor = conn.cursor()
+            
+            # Job totals and recent activity in a single pass over jobs
+            cursor.execute(STATUS_JOBS_SQL)
+            total_jobs, jobs_last_24h, jobs_last_week = cursor.fetchone()
+            
+            # Jobs by company (only the top 10 are displayed)
+            cursor.execute(STATUS_BY_COMPANY_SQL)
+            jobs_by_company = cursor.fetchall()
+            
+            # Scrape logs
+            cursor.execute(STATUS_SCRAPES_SQL)
+            successful_scrapes_24h, failed_scrapes_24h = cursor.fetchone()
         
         # Display statistics
         print(f"📈 Total Jobs: {total_jobs:,}")
@@ -177,7 +219,7 @@ def status_command(args):
         
         if args.detailed and jobs_by_company:
             print(f"\n🏢 Jobs by Company:")
-            for company, count in jobs_by_company[:10]:  # Top 10
+            for company, count in jobs_by_company:
                 print(f"   {company}: {count:,}")
         
         return 0
@@ -189,6 +231,8 @@ def status_command(args):
 def list_command(args):
     """Handle list command"""
     try:
+        from scraper_config import load_companies_from_json
+        
         companies = load_companies_from_json('companies.json')
         
         if args.format == 'json':
@@ -217,35 +261,22 @@ def clean_command(args):
     print(f"🧹 Cleaning data older than {args.days} days...")
     
     try:
-        db = DatabaseManager()
-        import sqlite3
         from datetime import timedelta
-        
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
+        from scraper import DatabaseManager
         
         # Calculate cutoff date
         cutoff_date = (datetime.now() - timedelta(days=args.days)).isoformat()
         
-        # Clean old jobs
-        cursor.execute("SELECT COUNT(*) FROM jobs WHERE scraped_at < ?", (cutoff_date,))
-        jobs_to_delete = cursor.fetchone()[0]
-        
-        cursor.execute("DELETE FROM jobs WHERE scraped_at < ?", (cutoff_date,))
-        
-        deleted_logs = 0
-        if args.logs:
-            cursor.execute("SELECT COUNT(*) FROM scrape_logs WHERE started_at < ?", (cutoff_date,))
-            logs_to_delete = cursor.fetchone()[0]
+        with closing(DatabaseManager()) as db:
+            # Clean old jobs; the DELETE reports how many rows it removed
+            deleted_jobs = db.delete_older_than('jobs', 'scraped_at', cutoff_date)
             
-            cursor.execute("DELETE FROM scrape_logs WHERE started_at < ?", (cutoff_date,))
-            deleted_logs = cursor.rowcount
-        
-        conn.commit()
-        conn.close()
+            deleted_logs = 0
+            if args.logs:
+                deleted_logs = db.delete_older_than('scrape_logs', 'started_at', cutoff_date)
         
         print(f"✅ Cleanup completed:")
-        print(f"   🗑️  Deleted {jobs_to_delete} old jobs")
+        print(f"   🗑️  Deleted {deleted_jobs} old jobs")
         if args.logs:
             print(f"   📝 Deleted {deleted_logs} old logs")
         
@@ -260,59 +291,57 @@ def export_command(args):
     print(f"📤 Exporting jobs to {args.output}...")
     
     try:
-        db = DatabaseManager()
         import sqlite3
         import csv
         from datetime import timedelta
+        from scraper import DatabaseManager, atomic_write, write_json_array
         
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
-        
-        # Build query
-        query = "SELECT * FROM jobs WHERE 1=1"
-        params = []
-        
-        if args.company:
-            query += " AND company = ?"
-            params.append(args.company)
-        
-        if args.days:
-            cutoff_date = (datetime.now() - timedelta(days=args.days)).isoformat()
-            query += " AND scraped_at > ?"
-            params.append(cutoff_date)
-        
-        query += " ORDER BY scraped_at DESC"
-        
-        cursor.execute(query, params)
-        jobs = cursor.fetchall()
+        db = DatabaseManager()
         
-        if args.format == 'json':
-            # Get column names
-            columns = [description[0] for description in cursor.description]
+        with closing(sqlite3.connect(db.db_path)) as conn:
+            if args.format == 'json':
+                conn.row_factory = sqlite3.Row
+            conn.execute(PRAGMA_READ_CACHE)
+            cursor = conn.cursor()
+            cursor.arraysize = 5000
             
-            # Convert to list of dictionaries
-            jobs_list = []
-            for job in jobs:
-                job_dict = dict(zip(columns, job))
-                jobs_list.append(job_dict)
+            # Build query
+            where = " WHERE 1=1"
+            params = []
             
-            with open(args.output, 'w') as f:
-                json.dump(jobs_list, f, indent=2, default=str)
-                
-        elif args.format == 'csv':
-            with open(args.output, 'w', newline='') as f:
-                writer = csv.writer(f)
-                
-                # Write header
-                columns = [description[0] for description in cursor.description]
-                writer.writerow(columns)
-                
-                # Write data
-                writer.writerows(jobs)
-        
-        conn.close()
-        
-        print(f"✅ Exported {len(jobs)} jobs to {args.output}")
+            if args.company:
+                where += " AND company = ?"
+                params.append(args.company)
+            
+            if args.days:
+                cutoff_date = (datetime.now() - timedelta(days=args.days)).isoformat()
+                where += " AND scraped_at > ?"
+                params.append(cutoff_date)
+            
+            # The CSV writer consumes the cursor in C, so the row count comes
+            # from a COUNT(*) over the same snapshot
+            conn.execute("BEGIN")
+            cursor.execute("SELECT * FROM jobs" + where + " ORDER BY scraped_at DESC", params)
+            
+            # Rows are streamed straight from the cursor so memory use stays
+            # flat regardless of how many jobs are exported
+            exported = 0
+            if args.format == 'json':
+                exported = write_json_array(args.output, (dict(row) for row in cursor))
+            
+            elif args.format == 'csv':
+                with atomic_write(args.output, newline='') as f:
+                    writer = csv.writer(f)
+                    
+                    # Write header
+                    columns = [description[0] for description in cursor.description]
+                    writer.writerow(columns)
+                    
+                    # Write data straight from the cursor
+                    writer.writerows(cursor)
+                exported = conn.execute("SELECT COUNT(*) FROM jobs" + where, params).fetchone()[0]
+        
+        print(f"✅ Exported {exported} jobs to {args.output}")
         return 0
         
     except Exception as e:
@@ -321,6 +350,8 @@ def export_command(args):
 
 def config_command(args):
     """Handle config command"""
+    from scraper_config import load_companies_from_json, load_proxies_from_json
+    
     if args.show:
         print("⚙️  Configuration Files")
         print("=" * 50)
@@ -389,9 +420,9 @@ def config_command(args):
     
     return 0
 
-async def main():
+def main():
     """Main CLI function"""
-    parser = create_parser()
+    parser = create_parser(_sniff_subcommand(sys.argv[1:]))
     args = parser.parse_args()
     
     if not args.command:
@@ -400,7 +431,11 @@ async def main():
     
     # Handle commands
     if args.command == 'scrape':
-        return await scrape_command(args)
+        # Only scraping is asynchronous; other commands skip the event loop
+        import asyncio
+        if args.profile:
+            return profile_command(scrape_command, args)
+        return asyncio.run(scrape_command(args))
     elif args.command == 'status':
         return status_command(args)
     elif args.command == 'list':
@@ -417,7 +452,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        exit_code = asyncio.run(main())
+        exit_code = main()
         sys.exit(exit_code)
     except KeyboardInterrupt:
         print("\n⏹️  Operation cancelled by user")
@@ -9,14 +9,16 @@ import sys
 import sqlite3
 import json
 import logging
+import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import uuid
+from contextlib import closing
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from scraper import DatabaseManager
+from scraper import DatabaseManager, atomic_write, write_json_array
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +31,91 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Next.js company data files (relative to src/data) that define slugs
+COMPANY_DATA_FILES = ('companies.ts', 'companies-extended.ts')
+
+# Matches `name: "...", slug: "..."` pairs in the company data files
+COMPANY_SLUG_PATTERN = re.compile(
+    r"""name:\s*['"]([^'"]+)['"]\s*,\s*slug:\s*['"]([^'"]+)['"]"""
+)
+
+# Splits names such as "Alphabet (Google)" into their two parts
+COMPANY_ALIAS_PATTERN = re.compile(r'^(.+?)\s*\((.+)\)$')
+
+# Fallback slugs for scraped names missing from the company data
+DEFAULT_COMPANY_SLUGS = {
+    'Google': 'google',
+    'Microsoft': 'microsoft',
+    'Apple': 'apple',
+    'Amazon': 'amazon',
+    'Meta': 'meta',
+    'Netflix': 'netflix',
+    'Spotify': 'spotify',
+    'Uber': 'uber',
+    'Airbnb': 'airbnb',
+    'LinkedIn': 'linkedin'
+}
+
+# Namespace for the deterministic PostgreSQL job IDs
+JOB_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'job-portal-scraper/jobs')
+
+# Defaults applied to every transformed job. They are shared (not copied)
+# between jobs, so treat them as read-only; their JSON is serialized once.
+DEFAULT_JOB_TYPE = 'Full-time'
+DEFAULT_JOB_LEVEL = 'Mid-level'
+DEFAULT_BENEFITS = [
+    'Competitive salary',
+    'Health insurance',
+    'Remote work options'
+]
+DEFAULT_SALARY = {
+    'min': 80000,
+    'max': 150000,
+    'currency': 'USD'
+}
+DEFAULT_BENEFITS_JSON = json.dumps(DEFAULT_BENEFITS)
+DEFAULT_SALARY_JSON = json.dumps(DEFAULT_SALARY)
+
+# Rows per multi-row INSERT in the generated SQL file
+SQL_INSERT_BATCH_SIZE = 1000
+
+SQL_INSERT_PREFIX = """
+INSERT INTO "Job" (
+    id, title, company, "companySlug", location, department, type, level,
+    description, requirements, benefits, skills, salary, "applicationUrl",
+    "postedDate", "externalId", "sourceUrl"
+) VALUES
+"""
+
+# Common tech skills to look for
+COMMON_SKILLS = [
+    'JavaScript', 'TypeScript', 'Python', 'Java', 'React', 'Node.js',
+    'AWS', 'Docker', 'Kubernetes', 'SQL', 'PostgreSQL', 'MongoDB',
+    'Git', 'CI/CD', 'Agile', 'Scrum', 'REST', 'GraphQL', 'HTML',
+    'CSS', 'Vue.js', 'Angular', 'C++', 'C#', 'Go', 'Rust',
+    'Machine Learning', 'AI', 'Data Science', 'DevOps', 'Linux'
+]
+
+# All skills in one pass over the text. Longest names are tried first and
+# matches must stand alone, so "Java" doesn't fire on "JavaScript" or "Go"
+# on "Google".
+SKILLS_PATTERN = re.compile(
+    r'(?<!\w)(?:'
+    + '|'.join(re.escape(skill) for skill in sorted(COMMON_SKILLS, key=len, reverse=True))
+    + r')(?!\w)',
+    re.IGNORECASE
+)
+
+def sql_literal(value) -> str:
+    """Render a Python value as a PostgreSQL literal"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
 class DatabaseIntegrator:
     """
     Integrates scraped job data from SQLite with the main PostgreSQL database
@@ -36,6 +123,10 @@ class DatabaseIntegrator:
     
     def __init__(self):
         self.sqlite_db = DatabaseManager()
+        
+        # One connection is reused for every read made by this integrator
+        self._conn = self.sqlite_db.connect()
+        self._conn.row_factory = sqlite3.Row  # Enable row access by column name
         self.postgres_config = {
             'host': os.getenv('POSTGRES_HOST', 'localhost'),
             'port': os.getenv('POSTGRES_PORT', '5432'),
@@ -50,55 +141,65 @@ class DatabaseIntegrator:
         # Load company data for mapping
         self.load_company_mapping()
     
+    def close(self):
+        """Close the SQLite connection"""
+        self._conn.close()
+    
     def load_company_mapping(self):
-        """Load company mapping from Next.js data"""
+        """Load company name -> slug mapping from Next.js data"""
         try:
             # Try to load from the main project's company data
-            company_data_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), 
-                'src', 'data', 'companies.ts'
+            data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                'src', 'data'
             )
             
-            if os.path.exists(company_data_path):
-                logger.info("Found company data from main project")
-                # For now, we'll use a simple mapping
-                # In a real implementation, you'd parse the TypeScript file
-                self.company_mapping = {
-                    'Google': 'google',
-                    'Microsoft': 'microsoft',
-                    'Apple': 'apple',
-                    'Amazon': 'amazon',
-                    'Meta': 'meta',
-                    'Netflix': 'netflix',
-                    'Spotify': 'spotify',
-                    'Uber': 'uber',
-                    'Airbnb': 'airbnb',
-                    'LinkedIn': 'linkedin'
-                }
+            for filename in COMPANY_DATA_FILES:
+                company_data_path = os.path.join(data_dir, filename)
+                if not os.path.exists(company_data_path):
+                    continue
+                
+                with open(company_data_path, encoding='utf-8') as f:
+                    for name, slug in COMPANY_SLUG_PATTERN.findall(f.read()):
+                        self.company_mapping[name] = slug
+                        
+                        # "Alphabet (Google)" is scraped as "Google"
+                        alias = COMPANY_ALIAS_PATTERN.match(name)
+                        if alias:
+                            self.company_mapping.setdefault(alias.group(1), slug)
+                            self.company_mapping.setdefault(alias.group(2), slug)
+            
+            if self.company_mapping:
+                logger.info(f"Loaded {len(self.company_mapping)} company slugs from main project")
             else:
                 logger.warning("Company data not found, using default mapping")
                 
         except Exception as e:
             logger.warning(f"Could not load company mapping: {e}")
+        
+        for name, slug in DEFAULT_COMPANY_SLUGS.items():
+            self.company_mapping.setdefault(name, slug)
+    
+    def company_slug(self, company: str) -> str:
+        """Map a company name to its slug, remembering derived slugs"""
+        slug = self.company_mapping.get(company)
+        if slug is None:
+            slug = self.company_mapping[company] = company.lower().replace(' ', '-')
+        return slug
     
     def get_sqlite_jobs(self, since_hours: int = 24) -> List[Dict]:
         """Get jobs from SQLite database"""
         try:
-            conn = sqlite3.connect(self.sqlite_db.db_path)
-            conn.row_factory = sqlite3.Row  # Enable row access by column name
-            cursor = conn.cursor()
-            
             # Get jobs from the last N hours
             since_time = (datetime.now() - timedelta(hours=since_hours)).isoformat()
             
-            cursor.execute("""
+            cursor = self._conn.execute("""
                 SELECT * FROM jobs 
                 WHERE scraped_at > ? 
                 ORDER BY scraped_at DESC
             """, (since_time,))
             
-            jobs = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            jobs = [dict(row) for row in cursor]
             
             logger.info(f"Retrieved {len(jobs)} jobs from SQLite (last {since_hours} hours)")
             return jobs
@@ -107,67 +208,64 @@ class DatabaseIntegrator:
             logger.error(f"Error retrieving SQLite jobs: {e}")
             return []
     
-    def transform_job_data(self, job: Dict) -> Dict:
-        """Transform SQLite job data to match PostgreSQL schema"""
-        try:
-            # Generate a unique ID for the job
-            job_id = str(uuid.uuid4())
-            
-            # Map company name to slug
-            company_slug = self.company_mapping.get(job['company'], job['company'].lower().replace(' ', '-'))
-            
-            # Transform the job data
-            transformed = {
-                'id': job_id,
-                'title': job['title'] or 'Unknown Position',
-                'company': job['company'],
-                'companySlug': company_slug,
-                'location': job['location'] or 'Remote',
-                'department': job['department'] or 'Engineering',
-                'type': 'Full-time',  # Default type
-                'level': 'Mid-level',  # Default level
-                'description': job['description'] or 'No description available.',
-                'requirements': job['requirements'] or 'Requirements not specified.',
-                'benefits': [
-                    'Competitive salary',
-                    'Health insurance',
-                    'Remote work options'
-                ],
-                'skills': self.extract_skills(job['description'] or '', job['requirements'] or ''),
-                'salary': {
-                    'min': 80000,
-                    'max': 150000,
-                    'currency': 'USD'
-                },
-                'applicationUrl': job.get('job_url', '#'),
-                'postedDate': job['scraped_at'],
-                'externalId': job['id'],  # Keep reference to original scraper ID
-                'sourceUrl': job.get('source_url', '')
-            }
-            
-            return transformed
-            
-        except Exception as e:
-            logger.error(f"Error transforming job data: {e}")
-            return None
+    def transform_jobs(self, jobs: List[Dict]) -> List[Dict]:
+        """Transform SQLite job data to match PostgreSQL schema
+
+        Jobs that fail to transform are logged and skipped.
+        """
+        # Bind per-job lookups once for the loop
+        company_slug = self.company_slug
+        extract_skills = self.extract_skills
+        uuid5 = uuid.uuid5
+        
+        transformed_jobs = []
+        append = transformed_jobs.append
+        
+        for job in jobs:
+            try:
+                company = job['company']
+                description = job['description']
+                requirements = job['requirements']
+                
+                append({
+                    # Derive the ID from the scraper's own ID so re-syncing the
+                    # same job yields the same row (and ON CONFLICT skips it)
+                    'id': str(uuid5(JOB_ID_NAMESPACE, f"{company}:{job['id']}")),
+                    'title': job['title'] or 'Unknown Position',
+                    'company': company,
+                    'companySlug': company_slug(company),
+                    'location': job['location'] or 'Remote',
+                    'department': job.get('department') or 'Engineering',
+                    'type': DEFAULT_JOB_TYPE,
+                    'level': DEFAULT_JOB_LEVEL,
+                    'description': description or 'No description available.',
+                    'requirements': requirements or 'Requirements not specified.',
+                    'benefits': DEFAULT_BENEFITS,
+                    'skills': extract_skills(description or '', requirements or ''),
+                    'salary': DEFAULT_SALARY,
+                    'applicationUrl': job.get('job_url', '#'),
+                    'postedDate': job['scraped_at'],
+                    'externalId': job['id'],  # Keep reference to original scraper ID
+                    'sourceUrl': job.get('source_url', '')
+                })
+                
+            except Exception as e:
+                logger.error(f"Error transforming job data: {e}")
+        
+        return transformed_jobs
+    
+    def transform_job_data(self, job: Dict) -> Optional[Dict]:
+        """Transform a single SQLite job (see transform_jobs)"""
+        transformed = self.transform_jobs([job])
+        return transformed[0] if transformed else None
     
     def extract_skills(self, description: str, requirements: str) -> List[str]:
         """Extract skills from job description and requirements"""
-        # Common tech skills to look for
-        common_skills = [
-            'JavaScript', 'TypeScript', 'Python', 'Java', 'React', 'Node.js',
-            'AWS', 'Docker', 'Kubernetes', 'SQL', 'PostgreSQL', 'MongoDB',
-            'Git', 'CI/CD', 'Agile', 'Scrum', 'REST', 'GraphQL', 'HTML',
-            'CSS', 'Vue.js', 'Angular', 'C++', 'C#', 'Go', 'Rust',
-            'Machine Learning', 'AI', 'Data Science', 'DevOps', 'Linux'
-        ]
-        
-        text = f"{description} {requirements}".lower()
-        found_skills = []
-        
-        for skill in common_skills:
-            if skill.lower() in text:
-                found_skills.append(skill)
+        found = {
+            match.group(0).lower()
+            for match in SKILLS_PATTERN.finditer(f"{description} {requirements}")
+        }
+        found_skills = [skill for skill in COMMON_SKILLS if skill.lower() in found]
         
         # Return top 10 skills to avoid overwhelming
         return found_skills[:10] if found_skills else ['General']
@@ -182,17 +280,12 @@ class DatabaseIntegrator:
         
         try:
             # Transform jobs
-            transformed_jobs = []
-            for job in jobs:
-                transformed = self.transform_job_data(job)
-                if transformed:
-                    transformed_jobs.append(transformed)
+            transformed_jobs = self.transform_jobs(jobs)
             
             # Save to JSON file for import
             output_file = f"jobs_for_import_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
             
-            with open(output_file, 'w') as f:
-                json.dump(transformed_jobs, f, indent=2, default=str)
+            write_json_array(output_file, transformed_jobs)
             
             logger.info(f"✅ Transformed and saved {len(transformed_jobs)} jobs to {output_file}")
             logger.info(f"📄 You can import this file into your PostgreSQL database")
@@ -208,45 +301,20 @@ class DatabaseIntegrator:
             return 0
     
     def generate_sql_inserts(self, jobs: List[Dict], filename: str):
-        """Generate SQL INSERT statements for PostgreSQL"""
+        """Generate batched multi-row SQL INSERT statements for PostgreSQL"""
         try:
-            with open(filename, 'w') as f:
+            # fsync before the rename so a psql replay never sees a partial file
+            with atomic_write(filename, fsync=True) as f:
                 f.write("-- Job Portal - Scraped Jobs Import\n")
-                f.write("-- Generated on " + datetime.now().isoformat() + "\n\n")
+                f.write("-- Generated on " + datetime.now().isoformat() + "\n")
                 
-                for job in jobs:
-                    # Escape single quotes in strings
-                    def escape_sql(value):
-                        if isinstance(value, str):
-                            return value.replace("'", "''")
-                        return value
-                    
-                    sql = f"""
-INSERT INTO "Job" (
-    id, title, company, "companySlug", location, department, type, level,
-    description, requirements, benefits, skills, salary, "applicationUrl",
-    "postedDate", "externalId", "sourceUrl"
-) VALUES (
-    '{job['id']}',
-    '{escape_sql(job['title'])}',
-    '{escape_sql(job['company'])}',
-    '{job['companySlug']}',
-    '{escape_sql(job['location'])}',
-    '{escape_sql(job['department'])}',
-    '{job['type']}',
-    '{job['level']}',
-    '{escape_sql(job['description'][:500])}...',
-    '{escape_sql(job['requirements'][:500])}...',
-    '{json.dumps(job['benefits'])}',
-    '{json.dumps(job['skills'])}',
-    '{json.dumps(job['salary'])}',
-    '{job['applicationUrl']}',
-    '{job['postedDate']}',
-    '{job['externalId']}',
-    '{job['sourceUrl']}'
-) ON CONFLICT (id) DO NOTHING;
-"""
-                    f.write(sql)
+                # One INSERT per batch keeps replay fast without producing
+                # statements too large for psql to handle comfortably
+                for start in range(0, len(jobs), SQL_INSERT_BATCH_SIZE):
+                    batch = jobs[start:start + SQL_INSERT_BATCH_SIZE]
+                    f.write(SQL_INSERT_PREFIX)
+                    f.write(",\n".join(self.sql_values_row(job) for job in batch))
+                    f.write("\nON CONFLICT (id) DO NOTHING;\n")
                 
                 f.write(f"\n-- Total jobs: {len(jobs)}\n")
             
@@ -255,6 +323,29 @@ INSERT INTO "Job" (
         except Exception as e:
             logger.error(f"Error generating SQL: {e}")
     
+    def sql_values_row(self, job: Dict) -> str:
+        """Render a transformed job as one row of a multi-row VALUES list"""
+        values = (
+            job['id'],
+            job['title'],
+            job['company'],
+            job['companySlug'],
+            job['location'],
+            job['department'],
+            job['type'],
+            job['level'],
+            job['description'][:500] + '...',
+            job['requirements'][:500] + '...',
+            DEFAULT_BENEFITS_JSON if job['benefits'] is DEFAULT_BENEFITS else json.dumps(job['benefits']),
+            json.dumps(job['skills']),
+            DEFAULT_SALARY_JSON if job['salary'] is DEFAULT_SALARY else json.dumps(job['salary']),
+            job['applicationUrl'],
+            job['postedDate'],
+            job['externalId'],
+            job['sourceUrl']
+        )
+        return "    (" + ", ".join(sql_literal(value) for value in values) + ")"
+    
     async def run_integration(self, hours: int = 24) -> Dict:
         """Run the integration process"""
         logger.info(f"🔄 Starting database integration (last {hours} hours)")
@@ -304,29 +395,28 @@ async def main():
     
     args = parser.parse_args()
     
-    integrator = DatabaseIntegrator()
-    
-    if args.test:
-        logger.info("🧪 Running in test mode")
-        # Create some test data
-        test_job = {
-            'id': 'test_123',
-            'title': 'Senior Software Engineer',
-            'company': 'Google',
-            'location': 'Mountain View, CA',
-            'department': 'Engineering',
-            'description': 'Work on cutting-edge technology...',
-            'requirements': 'BS/MS in Computer Science, 5+ years experience...',
-            'job_url': 'https://careers.google.com/jobs/123',
-            'scraped_at': datetime.now().isoformat(),
-            'source_url': 'https://careers.google.com'
-        }
-        
-        result = await integrator.sync_to_postgres([test_job])
-        print(f"Test result: {result} job(s) processed")
-    else:
-        result = await integrator.run_integration(args.hours)
-        print(f"Integration result: {result}")
+    with closing(DatabaseIntegrator()) as integrator:
+        if args.test:
+            logger.info("🧪 Running in test mode")
+            # Create some test data
+            test_job = {
+                'id': 'test_123',
+                'title': 'Senior Software Engineer',
+                'company': 'Google',
+                'location': 'Mountain View, CA',
+                'department': 'Engineering',
+                'description': 'Work on cutting-edge technology...',
+                'requirements': 'BS/MS in Computer Science, 5+ years experience...',
+                'job_url': 'https://careers.google.com/jobs/123',
+                'scraped_at': datetime.now().isoformat(),
+                'source_url': 'https://careers.google.com'
+            }
+            
+            result = await integrator.sync_to_postgres([test_job])
+            print(f"Test result: {result} job(s) processed")
+        else:
+            result = await integrator.run_integration(args.hours)
+            print(f"Integration result: {result}")
 
 if __name__ == "__main__":
     asyncio.run(main())
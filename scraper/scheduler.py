@@ -4,85 +4,159 @@ Uses asyncio for scheduling without external dependencies
 """
 
 import asyncio
+import heapq
+import itertools
 import time
 import logging
+import logging.handlers
+import multiprocessing
 from datetime import datetime, timedelta
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 import json
 import os
 
+try:
+    import uvloop
+except ImportError:  # optional: fall back to the default asyncio event loop
+    uvloop = None
+
 # Import our scraper components
-from scraper import JobScraper, Company, load_companies_from_json, load_proxies_from_json, DatabaseManager
+from scraper import JobScraper, Company, load_companies_from_json, load_proxies_from_json, DatabaseManager, file_signature, atomic_write
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scheduler.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging; handlers go on this module's logger so re-imports don't
+# attach duplicates (scraper's basicConfig has already configured the root logger)
 logger = logging.getLogger(__name__)
+# Parse pool workers re-import this module as __mp_main__; only the main
+# process writes scheduler.log
+if not logger.handlers and multiprocessing.current_process().name == 'MainProcess':
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for log_handler in (
+        logging.handlers.RotatingFileHandler('scheduler.log', maxBytes=10_000_000, backupCount=5),
+        logging.StreamHandler()
+    ):
+        log_handler.setFormatter(log_formatter)
+        logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Last scrape times: a JSON snapshot plus an append-only log of updates since
+# the snapshot was written ("<company>\t<iso timestamp>" per line)
+SCRAPE_TIMES_FILE = 'last_scrape_times.json'
+SCRAPE_TIMES_LOG = 'last_scrape_times.log'
+
+# Log entries after which the scrape times log is folded into the snapshot
+SCRAPE_TIMES_LOG_MAX_ENTRIES = 1000
+
+def install_event_loop_policy():
+    """Use uvloop's libuv-based event loop when it is installed"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+def enable_eager_tasks():
+    """Start new tasks eagerly so coroutines that return before awaiting skip the loop (Python 3.12+)"""
+    eager_task_factory = getattr(asyncio, 'eager_task_factory', None)
+    if eager_task_factory is not None:
+        asyncio.get_running_loop().set_task_factory(eager_task_factory)
 
 class SimpleScheduler:
     """Simple scheduler without external dependencies"""
     
     def __init__(self):
+        # Min-heap of (next_run_mono, sequence, job); due times are time.monotonic()
+        # values so clock changes can't skew them, and the sequence number
+        # breaks ties so job dicts are never compared
         self.jobs = []
+        self._sequence = itertools.count()
+        # Strong references to running job tasks; the loop only keeps weak ones
+        self._tasks = set()
         self.running = False
     
-    def every(self, interval: int):
+    def every(self, interval: int = 1):
         return ScheduleBuilder(interval, self)
     
-    def add_job(self, job_func, interval_type: str, interval: int, at_time: str = None):
+    def add_job(self, job_func, interval_type: str, interval: int, at_hm: tuple = None, args: tuple = ()):
         job = {
             'func': job_func,
+            'args': args,
             'interval_type': interval_type,
             'interval': interval,
-            'at_time': at_time,
-            'last_run': None,
-            'next_run': self._calculate_next_run(interval_type, interval, at_time)
+            'at_hm': at_hm,
+            'last_run': None,  # wall-clock time.time() of the last run
+            'next_run_mono': self._calculate_next_run(interval_type, interval, at_hm)
         }
-        self.jobs.append(job)
+        self._push(job)
+    
+    def _push(self, job: Dict):
+        heapq.heappush(self.jobs, (job['next_run_mono'], next(self._sequence), job))
+    
+    def spawn(self, coro) -> asyncio.Task:
+        """Run a coroutine as a task, holding a reference until it finishes"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    def _calculate_next_run(self, interval_type: str, interval: int, at_hm: tuple = None) -> float:
+        """Monotonic time at which a job is next due"""
+        if at_hm and interval_type == 'day':
+            # Only wall-clock schedules need a datetime
+            now = datetime.now()
+            delay = (self._next_from(now, interval_type, interval, at_hm) - now).total_seconds()
+        else:
+            delay = self._interval_seconds(interval_type, interval)
+        return time.monotonic() + delay
     
-    def _calculate_next_run(self, interval_type: str, interval: int, at_time: str = None):
-        now = datetime.now()
-        
+    @staticmethod
+    def _interval_seconds(interval_type: str, interval: int) -> float:
+        """Length of a fixed (non wall-clock) schedule interval in seconds"""
         if interval_type == 'hours':
-            return now + timedelta(hours=interval)
+            return interval * 3600
         elif interval_type == 'day':
-            if at_time:
-                hour, minute = map(int, at_time.split(':'))
-                next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                if next_run <= now:
-                    next_run += timedelta(days=1)
-                return next_run
-            else:
-                return now + timedelta(days=1)
+            return 86400
         elif interval_type == 'hour':
-            return now + timedelta(hours=1)
+            return 3600
         else:
-            return now + timedelta(seconds=interval)
+            return interval
+    
+    @staticmethod
+    def _next_from(now: datetime, interval_type: str, interval: int, at_hm: tuple = None) -> datetime:
+        """Next run after now, computed directly; new schedule kinds must not step through time in a loop"""
+        if interval_type == 'day' and at_hm:
+            next_run = now.replace(hour=at_hm[0], minute=at_hm[1], second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            return next_run
+        return now + timedelta(seconds=SimpleScheduler._interval_seconds(interval_type, interval))
+    
+    def time_until_next(self) -> Optional[float]:
+        """Seconds until the earliest job is due (0 if overdue), or None if nothing is scheduled"""
+        if not self.jobs:
+            return None
+        return max(0.0, self.jobs[0][0] - time.monotonic())
     
     def run_pending(self):
-        now = datetime.now()
-        for job in self.jobs:
-            if job['next_run'] and now >= job['next_run']:
-                try:
-                    if asyncio.iscoroutinefunction(job['func']):
-                        asyncio.create_task(job['func']())
-                    else:
-                        job['func']()
-                    job['last_run'] = now
-                    job['next_run'] = self._calculate_next_run(
-                        job['interval_type'], 
-                        job['interval'], 
-                        job['at_time']
-                    )
-                    logger.info(f"Executed scheduled job: {job['func'].__name__}")
-                except Exception as e:
-                    logger.error(f"Error executing scheduled job {job['func'].__name__}: {e}")
+        """Run every job that is due; only the head of the heap is inspected"""
+        now = time.monotonic()
+        while self.jobs and self.jobs[0][0] <= now:
+            _, _, job = heapq.heappop(self.jobs)
+            try:
+                # Coroutine jobs become tracked tasks; a job that returns None
+                # (e.g. a skipped scrape) costs no task at all
+                result = job['func'](*job['args'])
+                if asyncio.iscoroutine(result):
+                    self.spawn(result)
+                job['last_run'] = time.time()
+                logger.info(f"Executed scheduled job: {job['func'].__name__}")
+            except Exception as e:
+                logger.error(f"Error executing scheduled job {job['func'].__name__}: {e}")
+            
+            # Always reschedule so a failing job isn't dropped from the heap
+            job['next_run_mono'] = self._calculate_next_run(
+                job['interval_type'], 
+                job['interval'], 
+                job['at_hm']
+            )
+            self._push(job)
 
 class ScheduleBuilder:
     """Builder for creating scheduled jobs"""
@@ -111,8 +185,8 @@ class ScheduleTimeUnit:
         self.interval = interval
         self.scheduler = scheduler
     
-    def do(self, job_func):
-        self.scheduler.add_job(job_func, self.unit_type, self.interval)
+    def do(self, job_func, *args):
+        self.scheduler.add_job(job_func, self.unit_type, self.interval, args=args)
         return self
     
     def at(self, time_str: str):
@@ -126,9 +200,11 @@ class ScheduleAtTime:
         self.interval = interval
         self.scheduler = scheduler
         self.at_time = at_time
+        # Parsed once here rather than on every reschedule
+        self.at_hm = tuple(map(int, at_time.split(':')))
     
-    def do(self, job_func):
-        self.scheduler.add_job(job_func, self.unit_type, self.interval, self.at_time)
+    def do(self, job_func, *args):
+        self.scheduler.add_job(job_func, self.unit_type, self.interval, self.at_hm, args=args)
         return self
 
 # Create global scheduler instance
@@ -139,20 +215,23 @@ class ScrapingScheduler:
     Automated scheduling system for job scraping with priority-based intervals
     """
     
-    def __init__(self):
+    def __init__(self, config_file: str = "scheduler_config.json"):
+        self.config_file = config_file
+        self.config = self.load_config()
         self.companies = []
         self.proxies = []
         self.db = DatabaseManager()
         self.running = False
-        self.last_health_check = None
+        self._wakeup = None  # asyncio.Event set by stop(), created in run()
+        self.last_health_check = None  # time.time() of the last health check
         self.scraping_in_progress = False
+        self.last_scrape_times = {}
+        self._scrape_times_fd = None
+        self._scrape_times_log_entries = 0
         
-        # Company priority configuration
-        self.company_priorities = {
-            'high': ['Google', 'Microsoft', 'Apple', 'Amazon', 'Meta', 'Netflix'],
-            'medium': ['Spotify', 'Uber', 'Airbnb', 'LinkedIn', 'Twitter', 'Salesforce'],
-            'low': []  # Will be populated with remaining companies
-        }
+        # priority -> [Company], rebuilt only when companies.json changes
+        self._companies_by_priority = {}
+        self._companies_signature = None
         
         # Scraping intervals (in hours)
         self.scraping_intervals = {
@@ -165,38 +244,102 @@ class ScrapingScheduler:
             'total_scrapes': 0,
             'successful_scrapes': 0,
             'failed_scrapes': 0,
-            'last_scrape_time': None,
+            'last_scrape_time': None,  # time.time(); converted to ISO in get_status()
             'jobs_scraped_today': 0
         }
+    
+    def load_config(self) -> Dict:
+        """Load scheduler configuration"""
+        default_config = {
+            "scraping_intervals": {
+                "high_priority_companies": "every 2 hours",
+                "medium_priority_companies": "every 6 hours", 
+                "low_priority_companies": "daily"
+            },
+            "company_priorities": {
+                "Google": "high",
+                "Microsoft": "high",
+                "Apple": "high",
+                "Amazon": "high",
+                "Meta": "high",
+                "Netflix": "high",
+                "Spotify": "medium",
+                "Uber": "medium",
+                "Airbnb": "medium",
+                "LinkedIn": "medium",
+                "Twitter": "medium",
+                "Salesforce": "medium"
+            },
+            "max_concurrent_scrapes": 3,
+            "retry_failed_after_hours": 4,
+            "enable_proxy_rotation": True,
+            "job_retention_days": 90,
+            "scrape_log_retention_days": 90,
+            "rate_limits": {
+                "requests_per_minute": 30,
+                "requests_per_hour": 1000
+            }
+        }
         
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+                # Merge with defaults
+                for key, value in default_config.items():
+                    if key not in config:
+                        config[key] = value
+                return config
+            # No config file: run on the defaults without writing one
+            return default_config
+        except Exception as e:
+            logger.error(f"Error loading config: {e}")
+            return default_config
+    
+    def get_companies_by_priority(self, priority: str) -> List[Company]:
+        """Get companies for a priority level, re-indexing if companies.json changed"""
+        try:
+            signature = file_signature('companies.json')
+        except OSError:
+            signature = None
+        
+        if signature is None or signature != self._companies_signature:
+            self.companies = load_companies_from_json('companies.json')
+            company_priorities = self.config["company_priorities"]
+            companies_by_priority = {'high': [], 'medium': [], 'low': []}
+            for company in self.companies:
+                company_priority = company_priorities.get(company.name, "low")
+                companies_by_priority.setdefault(company_priority, []).append(company)
+            self._companies_by_priority = companies_by_priority
+            self._companies_signature = signature
+        
+        return self._companies_by_priority.get(priority, [])
+    
     async def initialize(self):
         """Initialize the scheduler with company and proxy configurations"""
         try:
-            # Load companies
-            self.companies = load_companies_from_json('companies.json')
+            # Load companies and build the priority index
+            self.get_companies_by_priority('high')
             if not self.companies:
                 logger.error("No companies found in companies.json")
                 return False
             
-            # Categorize companies by priority
-            high_priority = set(self.company_priorities['high'])
-            medium_priority = set(self.company_priorities['medium'])
-            
-            for company in self.companies:
-                if company.name not in high_priority and company.name not in medium_priority:
-                    self.company_priorities['low'].append(company.name)
-            
             # Load proxies (optional)
-            self.proxies = load_proxies_from_json('proxies.json')
+            if self.config["enable_proxy_rotation"]:
+                self.proxies = load_proxies_from_json('proxies.json')
             if self.proxies:
                 logger.info(f"Loaded {len(self.proxies)} proxy configurations")
             else:
                 logger.warning("No proxies found, will scrape without proxy rotation")
             
+            # Load previous scrape times and fold the log into the snapshot
+            self.load_scrape_times()
+            self.save_scrape_times()
+            
             logger.info(f"Initialized scheduler with {len(self.companies)} companies")
-            logger.info(f"Priority breakdown - High: {len(self.company_priorities['high'])}, "
-                       f"Medium: {len(self.company_priorities['medium'])}, "
-                       f"Low: {len(self.company_priorities['low'])}")
+            logger.info(f"Priority breakdown - High: {len(self._companies_by_priority['high'])}, "
+                       f"Medium: {len(self._companies_by_priority['medium'])}, "
+                       f"Low: {len(self._companies_by_priority['low'])}")
             
             return True
             
@@ -204,22 +347,71 @@ class ScrapingScheduler:
             logger.error(f"Failed to initialize scheduler: {e}")
             return False
     
+    def record_scrape_times(self, company_names: List[str], scraped_at: str):
+        """Update last scrape times in memory and append them to the scrape times log"""
+        for company_name in company_names:
+            self.last_scrape_times[company_name] = scraped_at
+        
+        try:
+            if self._scrape_times_fd is None:
+                self._scrape_times_fd = os.open(SCRAPE_TIMES_LOG, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            entries = ''.join(f"{company_name}\t{scraped_at}\n" for company_name in company_names)
+            os.write(self._scrape_times_fd, entries.encode('utf-8'))
+            self._scrape_times_log_entries += len(company_names)
+        except Exception as e:
+            logger.error(f"Error saving scrape times: {e}")
+        
+        # Keep the log short for long-running schedulers
+        if self._scrape_times_log_entries >= SCRAPE_TIMES_LOG_MAX_ENTRIES:
+            self.save_scrape_times()
+    
+    def save_scrape_times(self):
+        """Write last scrape times to the JSON snapshot and clear the log"""
+        try:
+            with atomic_write(SCRAPE_TIMES_FILE) as f:
+                json.dump(self.last_scrape_times, f, indent=2)
+            
+            if self._scrape_times_fd is not None:
+                os.close(self._scrape_times_fd)
+                self._scrape_times_fd = None
+            if os.path.exists(SCRAPE_TIMES_LOG):
+                os.remove(SCRAPE_TIMES_LOG)
+            self._scrape_times_log_entries = 0
+        except Exception as e:
+            logger.error(f"Error saving scrape times: {e}")
+    
+    def load_scrape_times(self):
+        """Load last scrape times from the snapshot, then replay the log (latest entry wins)"""
+        try:
+            if os.path.exists(SCRAPE_TIMES_FILE):
+                with open(SCRAPE_TIMES_FILE, 'r') as f:
+                    self.last_scrape_times = json.load(f)
+            
+            if os.path.exists(SCRAPE_TIMES_LOG):
+                with open(SCRAPE_TIMES_LOG, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        company_name, sep, scraped_at = line.rstrip('\n').rpartition('\t')
+                        if sep:
+                            self.last_scrape_times[company_name] = scraped_at
+        except Exception as e:
+            logger.error(f"Error loading scrape times: {e}")
+    
     def setup_schedule(self):
         """Setup the automated schedule for different priority companies"""
         
         # High priority companies - every 2 hours
         schedule.every(2).hours.do(
-            self.scrape_priority_companies, 'high'
+            self.start_priority_scrape, 'high'
         )
         
         # Medium priority companies - every 6 hours
         schedule.every(6).hours.do(
-            self.scrape_priority_companies, 'medium'
+            self.start_priority_scrape, 'medium'
         )
         
         # Low priority companies - daily at 2 AM
         schedule.every().day.at("02:00").do(
-            self.scrape_priority_companies, 'low'
+            self.start_priority_scrape, 'low'
         )
         
         # Health check - every hour
@@ -230,79 +422,90 @@ class ScrapingScheduler:
         
         logger.info("Automated schedule configured successfully")
     
+    def start_priority_scrape(self, priority: str):
+        """Return the scrape coroutine for a priority, or None if a scrape is already running"""
+        if self.scraping_in_progress:
+            logger.warning(f"Scraping already in progress, skipping {priority} priority scrape")
+            return None
+        return self.scrape_priority_companies(priority)
+    
     async def scrape_priority_companies(self, priority: str):
         """Scrape companies of a specific priority level"""
+        # Guard clauses run before any await so skipped runs complete eagerly
         if self.scraping_in_progress:
             logger.warning(f"Scraping already in progress, skipping {priority} priority scrape")
             return
         
-        self.scraping_in_progress = True
-        company_names = self.company_priorities.get(priority, [])
+        priority_companies = self.get_companies_by_priority(priority)
         
-        if not company_names:
+        if not priority_companies:
             logger.warning(f"No companies found for priority: {priority}")
-            self.scraping_in_progress = False
             return
         
-        logger.info(f"Starting {priority} priority scraping for {len(company_names)} companies")
+        logger.info(f"Starting {priority} priority scraping for {len(priority_companies)} companies")
+        await self._scrape_companies(priority_companies, f"{priority.capitalize()} priority")
+    
+    async def retry_failed_companies(self, company_names: List[str]):
+        """Retry scraping for specific companies"""
+        if self.scraping_in_progress:
+            logger.warning("Scraping already in progress, skipping retry")
+            return
+        
+        names = frozenset(company_names)
+        retry_companies = [c for c in self.companies if c.name in names]
+        
+        if retry_companies:
+            await self._scrape_companies(retry_companies, "Retry")
+    
+    async def _scrape_companies(self, companies: List[Company], label: str):
+        """Scrape the given companies, updating stats and last scrape times"""
+        self.scraping_in_progress = True
         
         try:
-            # Filter companies by priority
-            priority_companies = [c for c in self.companies if c.name in company_names]
-            
-            if not priority_companies:
-                logger.warning(f"No company objects found for {priority} priority")
-                return
-            
             # Run scraping
-            async with JobScraper(priority_companies, self.proxies) as scraper:
-                results = await scraper.scrape_all_companies()
+            async with JobScraper(companies, self.proxies) as scraper:
+                results = await scraper.scrape_all_companies(
+                    max_concurrent=self.config["max_concurrent_scrapes"]
+                )
             
             # Update statistics
-            total_jobs = sum(len(jobs) for jobs in results.values())
+            total_jobs = results.total
             self.stats['total_scrapes'] += 1
-            self.stats['last_scrape_time'] = datetime.now()
+            self.stats['last_scrape_time'] = time.time()
             self.stats['jobs_scraped_today'] += total_jobs
             
             if total_jobs > 0:
                 self.stats['successful_scrapes'] += 1
-                logger.info(f"✅ {priority.capitalize()} priority scraping completed: {total_jobs} jobs found")
+                logger.info(f"✅ {label} scraping completed: {total_jobs} jobs found")
             else:
-                logger.warning(f"⚠️ {priority.capitalize()} priority scraping completed but no jobs found")
+                logger.warning(f"⚠️ {label} scraping completed but no jobs found")
             
-            # Log per-company results
-            for company_name, jobs in results.items():
-                job_count = len(jobs)
-                status = "✅" if job_count > 0 else "⚠️"
-                logger.info(f"  {status} {company_name}: {job_count} jobs")
+            # Log per-company results; one line per company, so debug level only
+            if logger.isEnabledFor(logging.DEBUG):
+                for company_name, job_count in results.counts.items():
+                    logger.debug("  %s %s: %d jobs", "OK" if job_count > 0 else "WARN", company_name, job_count)
+            
+            # Update last scrape times
+            self.record_scrape_times(list(results.counts), datetime.now().isoformat())
         
         except Exception as e:
             self.stats['failed_scrapes'] += 1
-            logger.error(f"❌ {priority.capitalize()} priority scraping failed: {e}")
+            logger.error(f"❌ {label} scraping failed: {e}")
         
         finally:
             self.scraping_in_progress = False
     
-    def health_check(self):
-        """Perform health check on the scraping system"""
+    async def health_check(self):
+        """Perform health check on the scraping system and retry stale companies"""
         try:
             logger.info("🔍 Performing health check...")
             
-            # Check database connectivity
-            import sqlite3
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM jobs")
-            total_jobs = cursor.fetchone()[0]
-            
-            # Check recent activity
-            cursor.execute("SELECT COUNT(*) FROM jobs WHERE scraped_at > datetime('now', '-24 hours')")
-            jobs_last_24h = cursor.fetchone()[0]
-            
-            conn.close()
+            # Check database connectivity and recent activity; sqlite calls run
+            # in a worker thread so in-flight scrapes aren't stalled
+            total_jobs, jobs_last_24h = await self.db.get_job_counts_async()
             
             # Update health check timestamp
-            self.last_health_check = datetime.now()
+            self.last_health_check = time.time()
             
             # Log health status
             success_rate = (self.stats['successful_scrapes'] / max(self.stats['total_scrapes'], 1)) * 100
@@ -318,36 +521,40 @@ class ScrapingScheduler:
             if self.stats['total_scrapes'] > 0 and success_rate < 50:
                 logger.warning(f"⚠️ Low success rate detected: {success_rate:.1f}%")
             
+            # Check for companies that haven't been scraped recently
+            # Scrape times are stored as ISO-8601 strings, which sort chronologically,
+            # so compare them as strings instead of parsing each one
+            retry_threshold = (datetime.now() - timedelta(hours=self.config["retry_failed_after_hours"])).isoformat()
+            companies_to_retry = [
+                company_name for company_name, last_scrape in self.last_scrape_times.items()
+                if last_scrape < retry_threshold
+            ]
+            
+            if companies_to_retry:
+                logger.info(f"Found {len(companies_to_retry)} companies to retry: {companies_to_retry}")
+                # Schedule immediate retry for failed companies
+                schedule.spawn(self.retry_failed_companies(companies_to_retry))
+            
         except Exception as e:
             logger.error(f"❌ Health check failed: {e}")
     
-    def cleanup_old_data(self):
+    async def cleanup_old_data(self):
         """Clean up old job data and logs"""
         try:
             logger.info("🧹 Starting daily cleanup...")
             
-            import sqlite3
-            from datetime import timedelta
-            
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            
-            # Remove jobs older than 90 days
-            cutoff_date = (datetime.now() - timedelta(days=90)).isoformat()
+            # Remove jobs past the retention window (90 days by default)
+            job_days = self.config["job_retention_days"]
+            cutoff_date = (datetime.now() - timedelta(days=job_days)).isoformat()
+            jobs_to_delete = await self.db.delete_older_than_async('jobs', 'scraped_at', cutoff_date)
             
-            cursor.execute("SELECT COUNT(*) FROM jobs WHERE scraped_at < ?", (cutoff_date,))
-            jobs_to_delete = cursor.fetchone()[0]
+            # Remove old scrape logs (90 days by default)
+            log_days = self.config["scrape_log_retention_days"]
+            log_cutoff = (datetime.now() - timedelta(days=log_days)).isoformat()
+            logs_to_delete = await self.db.delete_older_than_async('scrape_logs', 'started_at', log_cutoff)
             
-            cursor.execute("DELETE FROM jobs WHERE scraped_at < ?", (cutoff_date,))
-            
-            # Remove old scrape logs
-            cursor.execute("SELECT COUNT(*) FROM scrape_logs WHERE started_at < ?", (cutoff_date,))
-            logs_to_delete = cursor.fetchone()[0]
-            
-            cursor.execute("DELETE FROM scrape_logs WHERE started_at < ?", (cutoff_date,))
-            
-            conn.commit()
-            conn.close()
+            # Fold the day's scrape times log into the snapshot
+            self.save_scrape_times()
             
             # Reset daily stats
             self.stats['jobs_scraped_today'] = 0
@@ -367,19 +574,27 @@ class ScrapingScheduler:
         
         self.setup_schedule()
         self.running = True
+        self._wakeup = asyncio.Event()
         
         logger.info("🚀 Scraping scheduler started")
         logger.info("📅 Schedule:")
-        logger.info(f"  ⭐ High priority ({len(self.company_priorities['high'])} companies): Every 2 hours")
-        logger.info(f"  ⚡ Medium priority ({len(self.company_priorities['medium'])} companies): Every 6 hours")
-        logger.info(f"  📅 Low priority ({len(self.company_priorities['low'])} companies): Daily at 2:00 AM")
+        logger.info(f"  ⭐ High priority ({len(self._companies_by_priority['high'])} companies): Every 2 hours")
+        logger.info(f"  ⚡ Medium priority ({len(self._companies_by_priority['medium'])} companies): Every 6 hours")
+        logger.info(f"  📅 Low priority ({len(self._companies_by_priority['low'])} companies): Daily at 2:00 AM")
         logger.info(f"  🔍 Health checks: Every hour")
         logger.info(f"  🧹 Cleanup: Daily at 3:00 AM")
         
+        # Initial scrape for high priority companies
+        await self.scrape_priority_companies('high')
+        
         try:
             while self.running:
                 schedule.run_pending()
-                await asyncio.sleep(30)  # Check every 30 seconds
+                # Sleep until the next job is due; stop() wakes us immediately
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=schedule.time_until_next())
+                except asyncio.TimeoutError:
+                    pass
                 
         except KeyboardInterrupt:
             logger.info("⏹️ Scheduler stopped by user")
@@ -391,29 +606,39 @@ class ScrapingScheduler:
     def stop(self):
         """Stop the scheduler"""
         self.running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+        self.save_scrape_times()
+        self.db.close()
         logger.info("🛑 Scheduler stop requested")
     
     def get_status(self) -> Dict:
         """Get current scheduler status"""
+        stats = self.stats.copy()
+        if stats['last_scrape_time']:
+            stats['last_scrape_time'] = datetime.fromtimestamp(stats['last_scrape_time']).isoformat()
+        
         return {
             'running': self.running,
             'scraping_in_progress': self.scraping_in_progress,
-            'last_health_check': self.last_health_check.isoformat() if self.last_health_check else None,
-            'stats': self.stats.copy(),
+            'last_health_check': datetime.fromtimestamp(self.last_health_check).isoformat() if self.last_health_check else None,
+            'stats': stats,
             'company_counts': {
                 priority: len(companies) 
-                for priority, companies in self.company_priorities.items()
+                for priority, companies in self._companies_by_priority.items()
             }
         }
 
 async def main():
     """Main function to run the scheduler"""
+    enable_eager_tasks()
     scheduler = ScrapingScheduler()
     
     try:
         await scheduler.run()
     except KeyboardInterrupt:
         logger.info("🛑 Shutting down scheduler...")
+    finally:
         scheduler.stop()
 
 if __name__ == "__main__":
@@ -429,299 +654,10 @@ if __name__ == "__main__":
     
     # Run the scheduler
     try:
+        install_event_loop_policy()
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Scheduler shutdown complete")
     except Exception as e:
         logger.error(f"Fatal error: {e}")
         exit(1)
-
-import asyncio
-import time
-import logging
-from datetime import datetime, timedelta
-from typing import Dict, List
-import json
-import os
-from scraper import JobScraper, Company, ProxyConfig, load_companies_from_json, load_proxies_from_json
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scheduler.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-class ScrapingScheduler:
-    """Automated job scraping scheduler"""
-    
-    def __init__(self, config_file: str = "scheduler_config.json"):
-        self.config_file = config_file
-        self.config = self.load_config()
-        self.is_running = False
-        self.last_scrape_times = {}
-        
-    def load_config(self) -> Dict:
-        """Load scheduler configuration"""
-        default_config = {
-            "scraping_intervals": {
-                "high_priority_companies": "every 2 hours",
-                "medium_priority_companies": "every 6 hours", 
-                "low_priority_companies": "daily"
-            },
-            "company_priorities": {
-                "Google": "high",
-                "Microsoft": "high",
-                "Apple": "high",
-                "Meta": "high",
-                "Amazon": "high",
-                "Netflix": "medium",
-                "Tesla": "medium",
-                "Salesforce": "medium",
-                "Adobe": "low",
-                "Spotify": "low"
-            },
-            "max_concurrent_scrapes": 3,
-            "retry_failed_after_hours": 4,
-            "enable_proxy_rotation": True,
-            "rate_limits": {
-                "requests_per_minute": 30,
-                "requests_per_hour": 1000
-            }
-        }
-        
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                # Merge with defaults
-                for key, value in default_config.items():
-                    if key not in config:
-                        config[key] = value
-                return config
-            else:
-                # Create default config file
-                with open(self.config_file, 'w') as f:
-                    json.dump(default_config, f, indent=2)
-                return default_config
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-            return default_config
-    
-    def get_companies_by_priority(self, priority: str) -> List[Company]:
-        """Get companies filtered by priority level"""
-        all_companies = load_companies_from_json('companies.json')
-        priority_companies = []
-        
-        for company in all_companies:
-            company_priority = self.config["company_priorities"].get(company.name, "low")
-            if company_priority == priority:
-                priority_companies.append(company)
-        
-        return priority_companies
-    
-    async def scrape_companies_by_priority(self, priority: str):
-        """Scrape companies of a specific priority level"""
-        try:
-            logger.info(f"Starting {priority} priority scraping session")
-            
-            companies = self.get_companies_by_priority(priority)
-            if not companies:
-                logger.info(f"No {priority} priority companies found")
-                return
-            
-            # Load proxies
-            proxies = load_proxies_from_json('proxies.json') if self.config["enable_proxy_rotation"] else []
-            
-            # Run scraping
-            async with JobScraper(companies, proxies) as scraper:
-                results = await scraper.scrape_all_companies()
-                
-                total_jobs = sum(len(jobs) for jobs in results.values())
-                logger.info(f"{priority.capitalize()} priority scraping completed. Total jobs: {total_jobs}")
-                
-                # Update last scrape times
-                current_time = datetime.now().isoformat()
-                for company_name in results.keys():
-                    self.last_scrape_times[company_name] = current_time
-                
-                # Save updated times
-                self.save_scrape_times()
-                
-        except Exception as e:
-            logger.error(f"Error in {priority} priority scraping: {e}")
-    
-    def save_scrape_times(self):
-        """Save last scrape times to file"""
-        try:
-            with open('last_scrape_times.json', 'w') as f:
-                json.dump(self.last_scrape_times, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving scrape times: {e}")
-    
-    def load_scrape_times(self):
-        """Load last scrape times from file"""
-        try:
-            if os.path.exists('last_scrape_times.json'):
-                with open('last_scrape_times.json', 'r') as f:
-                    self.last_scrape_times = json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading scrape times: {e}")
-    
-    def setup_schedule(self):
-        """Setup scraping schedule based on configuration"""
-        # High priority companies - every 2 hours
-        schedule.every(2).hours.do(
-            lambda: asyncio.create_task(self.scrape_companies_by_priority("high"))
-        )
-        
-        # Medium priority companies - every 6 hours  
-        schedule.every(6).hours.do(
-            lambda: asyncio.create_task(self.scrape_companies_by_priority("medium"))
-        )
-        
-        # Low priority companies - daily
-        schedule.every().day.at("02:00").do(
-            lambda: asyncio.create_task(self.scrape_companies_by_priority("low"))
-        )
-        
-        # Health check - every hour
-        schedule.every().hour.do(self.health_check)
-        
-        # Cleanup old data - daily
-        schedule.every().day.at("03:00").do(self.cleanup_old_data)
-        
-        logger.info("Scraping schedule configured")
-    
-    def health_check(self):
-        """Perform health check and retry failed scrapes"""
-        try:
-            logger.info("Performing health check...")
-            
-            # Check database connectivity
-            from scraper import DatabaseManager
-            db = DatabaseManager()
-            
-            # Check for companies that haven't been scraped recently
-            retry_threshold = datetime.now() - timedelta(hours=self.config["retry_failed_after_hours"])
-            
-            companies_to_retry = []
-            for company_name, last_scrape in self.last_scrape_times.items():
-                last_scrape_time = datetime.fromisoformat(last_scrape)
-                if last_scrape_time < retry_threshold:
-                    companies_to_retry.append(company_name)
-            
-            if companies_to_retry:
-                logger.info(f"Found {len(companies_to_retry)} companies to retry: {companies_to_retry}")
-                # Schedule immediate retry for failed companies
-                asyncio.create_task(self.retry_failed_companies(companies_to_retry))
-            
-            logger.info("Health check completed")
-            
-        except Exception as e:
-            logger.error(f"Error in health check: {e}")
-    
-    async def retry_failed_companies(self, company_names: List[str]):
-        """Retry scraping for specific companies"""
-        try:
-            all_companies = load_companies_from_json('companies.json')
-            retry_companies = [c for c in all_companies if c.name in company_names]
-            
-            if retry_companies:
-                proxies = load_proxies_from_json('proxies.json') if self.config["enable_proxy_rotation"] else []
-                
-                async with JobScraper(retry_companies, proxies) as scraper:
-                    results = await scraper.scrape_all_companies()
-                    
-                    total_jobs = sum(len(jobs) for jobs in results.values())
-                    logger.info(f"Retry scraping completed. Total jobs: {total_jobs}")
-                    
-                    # Update last scrape times
-                    current_time = datetime.now().isoformat()
-                    for company_name in results.keys():
-                        self.last_scrape_times[company_name] = current_time
-                    
-                    self.save_scrape_times()
-                    
-        except Exception as e:
-            logger.error(f"Error in retry scraping: {e}")
-    
-    def cleanup_old_data(self):
-        """Clean up old job data and logs"""
-        try:
-            logger.info("Starting data cleanup...")
-            
-            from scraper import DatabaseManager
-            db = DatabaseManager()
-            
-            # Remove jobs older than 90 days
-            cutoff_date = (datetime.now() - timedelta(days=90)).isoformat()
-            
-            conn = db.get_connection() if hasattr(db, 'get_connection') else None
-            if conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM jobs WHERE scraped_at < ?", (cutoff_date,))
-                deleted_jobs = cursor.rowcount
-                
-                # Remove old scrape logs (older than 30 days)
-                log_cutoff = (datetime.now() - timedelta(days=30)).isoformat()
-                cursor.execute("DELETE FROM scrape_logs WHERE started_at < ?", (log_cutoff,))
-                deleted_logs = cursor.rowcount
-                
-                conn.commit()
-                conn.close()
-                
-                logger.info(f"Cleanup completed: {deleted_jobs} old jobs, {deleted_logs} old logs removed")
-            
-        except Exception as e:
-            logger.error(f"Error in data cleanup: {e}")
-    
-    async def run_scheduler(self):
-        """Main scheduler loop"""
-        logger.info("Starting job scraping scheduler...")
-        
-        # Load previous scrape times
-        self.load_scrape_times()
-        
-        # Setup schedule
-        self.setup_schedule()
-        
-        # Initial scrape for high priority companies
-        await self.scrape_companies_by_priority("high")
-        
-        self.is_running = True
-        
-        try:
-            while self.is_running:
-                schedule.run_pending()
-                await asyncio.sleep(60)  # Check every minute
-                
-        except KeyboardInterrupt:
-            logger.info("Scheduler stopped by user")
-        except Exception as e:
-            logger.error(f"Scheduler error: {e}")
-        finally:
-            self.is_running = False
-    
-    def stop(self):
-        """Stop the scheduler"""
-        logger.info("Stopping scheduler...")
-        self.is_running = False
-
-async def main():
-    """Main function"""
-    scheduler = ScrapingScheduler()
-    
-    try:
-        await scheduler.run_scheduler()
-    except KeyboardInterrupt:
-        logger.info("Scheduler interrupted")
-    finally:
-        scheduler.stop()
-
-if __name__ == "__main__":
-    asyncio.run(main())
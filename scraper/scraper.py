@@ -5,31 +5,146 @@ A production-ready web scraping system with proxy rotation, rate limiting, and r
 
 import asyncio
 import aiohttp
+import functools
+import hashlib
+import heapq
+import itertools
 import json
 import time
 import random
 import logging
+import multiprocessing
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Iterable, Optional, Set
+from dataclasses import dataclass, asdict, field
 from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 import re
 from bs4 import BeautifulSoup
+import soupsieve
 import sqlite3
 import os
+import stat
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
+from scraper_config import (
+    Company, ProxyConfig, json_dumps, json_loads, file_signature,
+    load_companies_from_json, load_proxies_from_json
 )
+
+# Configure logging, except in parse pool workers, which re-import this
+# module and would otherwise open scraper.log again in every process
+if multiprocessing.current_process().name == 'MainProcess':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('scraper.log'),
+            logging.StreamHandler()
+        ]
+    )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Write buffer for exported files; large enough that big exports aren't
+# dominated by small write syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Rows removed per transaction when purging old data
+DELETE_BATCH_SIZE = 10000
+
+# Request headers shared by every fetch; only the User-Agent rotates.
+# aiohttp negotiates Accept-Encoding itself
+BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Career pages are streamed in chunks of this size, and abandoned once they
+# grow past MAX_PAGE_SIZE so a runaway response can't exhaust memory
+PAGE_CHUNK_SIZE = 64 * 1024
+MAX_PAGE_SIZE = 10 * 1024 * 1024
+
+# Prepared statements kept per connection; the multi-row job INSERTs alone
+# can need one per chunk size, so the default of 128 is too small
+CACHED_STATEMENTS = 256
+
+# Most jobs JobScraper's background writer saves in one transaction
+WRITE_BATCH_SIZE = 200
+
+# lxml's C parser is several times faster than the pure-Python html.parser;
+# it is optional, so fall back when it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# selectolax's Lexbor backend is faster still; when installed it is tried
+# first and BeautifulSoup is only used if it fails on a page
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Selectors used when a company doesn't configure its own
+DEFAULT_SELECTORS = {
+    'job_container': '.job, .position, .opening',
+    'title': 'h1, h2, h3, .title, .job-title',
+    'location': '.location, .job-location',
+    'description': '.description, .job-description',
+    'salary': '.salary, .compensation',
+}
+
+# Common salary patterns
+# Each number is (digits, digits after a thousands separator, 'k' suffix);
+# range patterns capture two numbers, the last pattern a single value
+SALARY_PATTERNS = [
+    re.compile(r'[\$£€](\d+),?(\d+)?\s*(k\b)?\s*-\s*[\$£€]?(\d+),?(\d+)?\s*(k\b)?', re.IGNORECASE),  # $100k - $150k
+    re.compile(r'(\d+),?(\d+)?\s*(k\b)?\s*-\s*(\d+),?(\d+)?\s*(k\b)', re.IGNORECASE),  # 100 - 150k
+    re.compile(r'[\$£€](\d+),?(\d+)?\s*(k\b)?', re.IGNORECASE),  # $100,000
+]
+
+# Longest job description kept for storage
+DESCRIPTION_MAX_LENGTH = 1000
+
+INSERT_JOB_SQL = """
+    INSERT OR REPLACE INTO jobs 
+    (id, title, company, location, description, url, posted_date, 
+     salary_min, salary_max, employment_type, requirements, benefits, scraped_at)
+    VALUES """
+JOB_ROW_PLACEHOLDERS = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Jobs per multi-row INSERT, keeping 13 columns per row under SQLite's
+# default limit of 999 bound variables per statement
+INSERT_JOB_CHUNK = 999 // 13
+
+INSERT_SCRAPE_LOG_SQL = """
+    INSERT INTO scrape_logs 
+    (company, url, status, jobs_found, error_message, started_at, completed_at, duration_seconds)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Per-connection tuning applied by DatabaseManager.connect; journal_mode=WAL
+# is persistent and set once in init_database. synchronous=NORMAL is durable
+# enough under WAL and avoids an fsync per commit. The busy timeout comes from
+# sqlite3.connect's timeout argument.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# slots=True drops the per-instance __dict__, which adds up when thousands of
+# jobs are held in a ScrapeResult or waiting in the writer queue
+@dataclass(slots=True)
 class Job:
     """Data class representing a job posting"""
     id: str
@@ -49,101 +164,206 @@ class Job:
     def __post_init__(self):
         if self.scraped_at is None:
             self.scraped_at = datetime.now().isoformat()
+    
+    def to_dict(self) -> Dict:
+        """Return the job as a plain JSON-serializable dict"""
+        return asdict(self)
 
 @dataclass
-class Company:
-    """Data class representing a company"""
-    name: str
-    career_url: str
-    base_url: str
-    selectors: Dict[str, str]
-    rate_limit: float = 2.0  # seconds between requests
-    last_scraped: Optional[str] = None
-
-@dataclass
-class ProxyConfig:
-    """Proxy configuration"""
-    host: str
-    port: int
-    username: Optional[str] = None
-    password: Optional[str] = None
-    protocol: str = 'http'
-    
-    @property
-    def url(self) -> str:
-        if self.username and self.password:
-            return f"{self.protocol}://{self.username}:{self.password}@{self.host}:{self.port}"
-        return f"{self.protocol}://{self.host}:{self.port}"
+class ScrapeResult:
+    """Jobs found per company, with counts kept up to date as companies finish"""
+    jobs: Dict[str, List[Job]] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    total: int = 0
+    
+    def add(self, company_name: str, jobs: List[Job]):
+        """Record the jobs scraped for a company"""
+        self.total += len(jobs) - self.counts.get(company_name, 0)
+        self.jobs[company_name] = jobs
+        self.counts[company_name] = len(jobs)
+    
+    def all_jobs(self) -> Iterable[Job]:
+        """Iterate over every scraped job"""
+        for jobs in self.jobs.values():
+            yield from jobs
 
 class ProxyManager:
-    """Manages proxy rotation and health checking"""
+    """Manages proxy rotation and health checking
+    
+    Active proxies sit in a min-heap keyed by (failures, last_used), so each
+    request gets the proxy that has failed least and equally healthy ones
+    take turns. Heap entries whose stats changed since they were pushed are
+    skipped when popped.
+    """
     
     def __init__(self, proxies: List[ProxyConfig]):
         self.proxies = proxies
         self.active_proxies = set(range(len(proxies)))
         self.failed_proxies = set()
         self.current_proxy = 0
-        self.last_rotation = time.time()
-        self.rotation_interval = 300  # 5 minutes
+        self.failure_counts = [0] * len(proxies)
+        self.success_counts = [0] * len(proxies)
+        self.last_used = [0.0] * len(proxies)
+        self._heap = []
+        self._entries = {}  # proxy index -> its current heap entry
+        for proxy_index in self.active_proxies:
+            self._push(proxy_index)
+    
+    def _push(self, proxy_index: int):
+        """(Re)insert a proxy with its current stats"""
+        entry = (self.failure_counts[proxy_index], self.last_used[proxy_index], proxy_index)
+        self._entries[proxy_index] = entry
+        heapq.heappush(self._heap, entry)
         
     def get_next_proxy(self) -> Optional[ProxyConfig]:
-        """Get the next available proxy"""
-        if not self.active_proxies:
-            logger.warning("No active proxies available")
-            return None
+        """Get the healthiest, least recently used active proxy"""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            proxy_index = entry[-1]
+            if self._entries.get(proxy_index) is not entry:
+                continue  # stale or deactivated
             
-        # Rotate proxy every 5 minutes or after failures
-        if (time.time() - self.last_rotation > self.rotation_interval or 
-            self.current_proxy not in self.active_proxies):
-            self.current_proxy = random.choice(list(self.active_proxies))
-            self.last_rotation = time.time()
-            
-        return self.proxies[self.current_proxy]
+            self.current_proxy = proxy_index
+            self.last_used[proxy_index] = time.monotonic()
+            self._push(proxy_index)
+            return self.proxies[proxy_index]
+        
+        logger.warning("No active proxies available")
+        return None
+    
+    def mark_proxy_succeeded(self, proxy_index: int):
+        """Record a successful request through a proxy"""
+        self.success_counts[proxy_index] += 1
     
     def mark_proxy_failed(self, proxy_index: int):
         """Mark a proxy as failed"""
+        self.failure_counts[proxy_index] += 1
         if proxy_index in self.active_proxies:
             self.active_proxies.remove(proxy_index)
             self.failed_proxies.add(proxy_index)
+            del self._entries[proxy_index]
             logger.warning(f"Proxy {proxy_index} marked as failed")
     
     def reset_failed_proxies(self):
-        """Reset failed proxies (for retry logic)"""
+        """Reset failed proxies (for retry logic)
+        
+        They keep their failure counts, so healthier proxies are still preferred.
+        """
+        for proxy_index in self.failed_proxies:
+            self._push(proxy_index)
         self.active_proxies.update(self.failed_proxies)
         self.failed_proxies.clear()
         logger.info("Reset all failed proxies")
 
 class RateLimiter:
-    """Rate limiting to respect website ToS"""
+    """Per-domain token bucket rate limiting to respect website ToS
+    
+    Each domain refills at one token per ``min_delay`` seconds up to ``burst``
+    tokens, so a few requests to the same host can go out together while the
+    long-run rate stays at one request per ``min_delay``.
+    """
     
-    def __init__(self):
-        self.request_times = {}
+    def __init__(self, burst: int = 3):
+        self.burst = burst
+        self.buckets: Dict[str, tuple] = {}  # domain -> (tokens, last_refill)
+        self.locks: Dict[str, asyncio.Lock] = {}
         
     async def wait_if_needed(self, domain: str, min_delay: float = 1.0):
-        """Wait if necessary to respect rate limits"""
-        current_time = time.time()
+        """Wait until a request token is available for the domain"""
+        if min_delay <= 0:
+            return
+        rate = 1.0 / min_delay
         
-        if domain in self.request_times:
-            time_since_last = current_time - self.request_times[domain]
-            if time_since_last < min_delay:
-                wait_time = min_delay - time_since_last
-                logger.debug(f"Rate limiting: waiting {wait_time:.2f}s for {domain}")
+        # Waiters on the same domain queue up in FIFO order behind the lock
+        lock = self.locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            tokens, last_refill = self.buckets.get(domain, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last_refill) * rate)
+            
+            if tokens < 1:
+                wait_time = (1 - tokens) / rate
+                logger.debug("Rate limiting: waiting %.2fs for %s", wait_time, domain)
                 await asyncio.sleep(wait_time)
-        
-        self.request_times[domain] = time.time()
+                tokens, now = 1.0, time.monotonic()
+            
+            self.buckets[domain] = (tokens - 1, now)
 
 class DatabaseManager:
     """SQLite database manager for storing scraped data"""
     
     def __init__(self, db_path: str = "jobs.db"):
         self.db_path = db_path
+        self._conn = None
+        # Serializes use of the long-lived connection across worker threads
+        self._lock = threading.Lock()
         self.init_database()
     
+    def connect(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection to the database with the standard PRAGMA tuning
+
+        Used for the manager's own connections and by other components that
+        need a separate one; keyword arguments go to sqlite3.connect.
+        """
+        kwargs.setdefault('cached_statements', CACHED_STATEMENTS)
+        conn = sqlite3.connect(self.db_path, timeout=5.0, **kwargs)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Return the manager's long-lived connection, opening it on first use
+
+        The connection is in autocommit mode; writes group their statements
+        with _transaction().
+        """
+        if self._conn is None:
+            self._conn = self.connect(check_same_thread=False, isolation_level=None)
+        return self._conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Hold the lock and run the block in an explicit BEGIN/COMMIT, rolling back on error"""
+        with self._lock:
+            conn = self.get_connection()
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def close(self):
+        """Close the long-lived connection if it was opened"""
+        with self._lock:
+            if self._conn is not None:
+                # Let SQLite refresh statistics for the indexes this session used
+                try:
+                    self._conn.execute("PRAGMA optimize")
+                except sqlite3.Error as e:
+                    logger.warning(f"PRAGMA optimize failed: {e}")
+                self._conn.close()
+                self._conn = None
+    
+    def get_job_counts(self) -> tuple:
+        """Return (total jobs, jobs scraped in the last 24 hours) in one query"""
+        with self._lock:
+            row = self.get_connection().execute("""
+                SELECT COUNT(*), COALESCE(SUM(scraped_at > datetime('now', '-24 hours')), 0)
+                FROM jobs
+            """).fetchone()
+        return row[0], row[1]
+    
     def init_database(self):
         """Initialize database tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
+        # WAL lets status/export readers run while a scrape is writing;
+        # the journal mode is stored in the database file itself
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Jobs table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS jobs (
@@ -192,66 +412,142 @@ class DatabaseManager:
             )
         """)
         
+        # Indexes for the time-window filters used by status/clean/export and
+        # the scheduler's cleanup
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_scraped_at ON jobs(scraped_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company_scraped ON jobs(company, scraped_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_logs_status_completed ON scrape_logs(status, completed_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company_posted ON jobs(company, posted_date DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_logs_started_at ON scrape_logs(started_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_logs_company_started ON scrape_logs(company, started_at)")
+        
         conn.commit()
         conn.close()
     
     def save_job(self, job: Job) -> bool:
         """Save job to database"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO jobs 
-                (id, title, company, location, description, url, posted_date, 
-                 salary_min, salary_max, employment_type, requirements, benefits, scraped_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        return self.save_jobs([job]) == 1
+    
+    def save_jobs(self, jobs: List[Job]) -> int:
+        """Save jobs in a single transaction, returning how many were stored"""
+        rows = [
+            (
                 job.id, job.title, job.company, job.location, job.description,
                 job.url, job.posted_date, job.salary_min, job.salary_max,
                 job.employment_type, 
-                json.dumps(job.requirements) if job.requirements else None,
-                json.dumps(job.benefits) if job.benefits else None,
+                json_dumps(job.requirements) if job.requirements else None,
+                json_dumps(job.benefits) if job.benefits else None,
                 job.scraped_at
-            ))
-            
-            conn.commit()
-            conn.close()
-            return True
+            )
+            for job in jobs
+        ]
+        if not rows:
+            return 0
+        
+        try:
+            # One commit (and one fsync) for the whole batch, with one
+            # multi-row INSERT per chunk instead of one statement per row
+            with self._transaction() as conn:
+                changes_before = conn.total_changes
+                for i in range(0, len(rows), INSERT_JOB_CHUNK):
+                    chunk = rows[i:i + INSERT_JOB_CHUNK]
+                    conn.execute(insert_jobs_sql(len(chunk)),
+                                 list(itertools.chain.from_iterable(chunk)))
+                logger.debug("Saved %d jobs (%d row changes)", len(rows),
+                             conn.total_changes - changes_before)
+            return len(rows)
         except Exception as e:
-            logger.error(f"Error saving job {job.id}: {e}")
-            return False
+            logger.error(f"Error saving {len(rows)} jobs: {e}")
+            return 0
     
     def log_scrape_session(self, company: str, url: str, status: str, 
                           jobs_found: int = 0, error_message: str = None,
                           started_at: str = None, completed_at: str = None,
                           duration: float = None):
         """Log scraping session"""
+        self.log_scrape_sessions([
+            (company, url, status, jobs_found, error_message, started_at, completed_at, duration)
+        ])
+    
+    def log_scrape_sessions(self, sessions: List[tuple]):
+        """Log several scraping sessions in one transaction
+
+        Each session is a (company, url, status, jobs_found, error_message,
+        started_at, completed_at, duration) tuple.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO scrape_logs 
-                (company, url, status, jobs_found, error_message, started_at, completed_at, duration_seconds)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (company, url, status, jobs_found, error_message, started_at, completed_at, duration))
-            
-            conn.commit()
-            conn.close()
+            with self._transaction() as conn:
+                conn.executemany(INSERT_SCRAPE_LOG_SQL, sessions)
         except Exception as e:
             logger.error(f"Error logging scrape session: {e}")
 
+    def delete_older_than(self, table: str, column: str, cutoff: str,
+                          batch_size: int = DELETE_BATCH_SIZE) -> int:
+        """Delete rows whose timestamp column is older than cutoff, returning the count
+
+        Rows are removed in batches that each commit on their own, so a large
+        purge never holds the write lock (or grows the WAL) for long.
+        """
+        deleted = 0
+        while True:
+            with self._transaction() as conn:
+                cursor = conn.execute(f"""
+                    DELETE FROM {table} WHERE rowid IN (
+                        SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?
+                    )
+                """, (cutoff, batch_size))
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return deleted
+    
+    # Awaitable variants for asyncio callers: the sqlite work runs on a worker
+    # thread so the event loop keeps servicing HTTP requests in the meantime
+    
+    async def save_jobs_async(self, jobs: List[Job]) -> int:
+        """save_jobs on a worker thread"""
+        return await asyncio.to_thread(self.save_jobs, jobs)
+    
+    async def log_scrape_sessions_async(self, sessions: List[tuple]):
+        """log_scrape_sessions on a worker thread"""
+        await asyncio.to_thread(self.log_scrape_sessions, sessions)
+    
+    async def get_job_counts_async(self) -> tuple:
+        """get_job_counts on a worker thread"""
+        return await asyncio.to_thread(self.get_job_counts)
+    
+    async def delete_older_than_async(self, table: str, column: str, cutoff: str,
+                                      batch_size: int = DELETE_BATCH_SIZE) -> int:
+        """delete_older_than on a worker thread"""
+        return await asyncio.to_thread(self.delete_older_than, table, column, cutoff, batch_size)
+
 class JobScraper:
     """Main job scraping engine"""
     
-    def __init__(self, companies: List[Company], proxies: List[ProxyConfig] = None):
+    def __init__(self, companies: List[Company], proxies: List[ProxyConfig] = None,
+                 max_connections: int = 0, max_connections_per_host: int = 3,
+                 parse_workers: Optional[int] = None):
         self.companies = companies
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
         self.proxy_manager = ProxyManager(proxies) if proxies else None
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = RateLimiter(burst=max_connections_per_host)
         self.db_manager = DatabaseManager()
         self.session = None
         self.scraped_urls = set()
+        # Job IDs already handed to the writer this run; a repeat would only
+        # overwrite the same row
+        self.scraped_job_ids = set()
+        # scrape_logs rows waiting to be written in one batch
+        self._scrape_sessions = []
+        # Jobs waiting for the background writer, and how many it has saved
+        self._job_queue = None
+        self._writer_task = None
+        self.saved_jobs = 0
+        # HTML parsing is CPU bound, so it runs in worker processes instead of
+        # blocking the event loop (None = one worker per CPU, 0 = parse inline,
+        # which is what profiling needs). The pool is shared process-wide
+        self.parse_workers = parse_workers
+        self._parse_pool = get_parse_pool(parse_workers) if parse_workers != 0 else None
         
         # User agents for rotation
         self.user_agents = [
@@ -261,71 +557,194 @@ class JobScraper:
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:89.0) Gecko/20100101 Firefox/89.0'
         ]
+        # One prebuilt headers dict per user agent, reused for every request
+        self._headers_pool = [dict(BASE_HEADERS, **{'User-Agent': ua}) for ua in self.user_agents]
+        # Parsed robots.txt per scheme://host, fetched once per scrape
+        self._robots: Dict[str, asyncio.Task] = {}
     
     async def __aenter__(self):
         """Async context manager entry"""
+        # One pooled session is shared by every request in the scrape so
+        # connections to the same host are kept alive and reused. There is no
+        # global socket cap by default (limit=0); politeness is per host, via
+        # limit_per_host and the RateLimiter
         timeout = aiohttp.ClientTimeout(total=30, connect=10)
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=3)
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            keepalive_timeout=60,
+            use_dns_cache=True,
+            ttl_dns_cache=600,
+            enable_cleanup_closed=True
+        )
         self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+        
+        # Database writes happen in a background task so scrapes never wait on sqlite
+        self._job_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._db_writer())
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        # A failed writer must not stop the session log flush or leak the
+        # HTTP session and database connection
+        try:
+            if self._writer_task:
+                self._job_queue.put_nowait(None)
+                await self._writer_task
+        except Exception as e:
+            logger.error(f"Background job writer failed: {e}")
+        finally:
+            try:
+                await self.flush_scrape_sessions()
+            finally:
+                try:
+                    if self.session:
+                        await self.session.close()
+                finally:
+                    self.db_manager.close()
+    
+    async def _db_writer(self):
+        """Save queued jobs in batches until the None sentinel arrives
+
+        Jobs queued while a batch is being written make up the next batch.
+        """
+        queue = self._job_queue
+        done = False
+        while not done:
+            job = await queue.get()
+            if job is None:
+                break
+            batch = [job]
+            while len(batch) < WRITE_BATCH_SIZE and not queue.empty():
+                job = queue.get_nowait()
+                if job is None:
+                    done = True
+                    break
+                batch.append(job)
+            self.saved_jobs += await self.db_manager.save_jobs_async(batch)
+    
+    def _record_scrape_session(self, company: Company, status: str, start_time: float,
+                               jobs_found: int = 0, error_message: str = None):
+        """Queue a scrape_logs row; rows are written by flush_scrape_sessions"""
+        self._scrape_sessions.append((
+            company.name, company.career_url, status, jobs_found, error_message,
+            datetime.fromtimestamp(start_time).isoformat(), datetime.now().isoformat(),
+            time.time() - start_time
+        ))
+    
+    async def flush_scrape_sessions(self):
+        """Write queued scrape_logs rows in a single transaction"""
+        if self._scrape_sessions:
+            sessions, self._scrape_sessions = self._scrape_sessions, []
+            await self.db_manager.log_scrape_sessions_async(sessions)
     
     def get_headers(self) -> Dict[str, str]:
-        """Generate headers with random user agent"""
-        return {
-            'User-Agent': random.choice(self.user_agents),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-    
-    async def fetch_page(self, url: str, company: str) -> Optional[str]:
-        """Fetch a page with proxy rotation and error handling"""
+        """Headers with a random user agent (shared dicts; do not modify)"""
+        return self._headers_pool[random.randrange(len(self._headers_pool))]
+    
+    async def _fetch_robots(self, origin: str, rate_limit: float) -> RobotFileParser:
+        """Fetch and parse origin's robots.txt; a missing file allows everything"""
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            status, content = await self._request(parser.url, rate_limit)
+            if status == 200 and content is not None:
+                parser.parse(content.splitlines())
+            elif status in (401, 403):
+                parser.disallow_all = True
+            else:
+                parser.allow_all = True
+        except Exception as e:
+            logger.debug("Could not fetch %s: %s", parser.url, e)
+            parser.allow_all = True
+        return parser
+    
+    async def robots_allows(self, url: str, rate_limit: float = 2.0) -> bool:
+        """Check url against its host's robots.txt, fetching that at most once per scrape"""
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        # Concurrent callers for the same host share one in-flight fetch
+        task = self._robots.get(origin)
+        if task is None:
+            task = self._robots[origin] = asyncio.ensure_future(self._fetch_robots(origin, rate_limit))
+        parser = await task
+        return parser.can_fetch('*', url)
+    
+    async def _request(self, url: str, rate_limit: float) -> tuple[int, Optional[str]]:
+        """Make one rate-limited GET through the next proxy, returning (status, text)
+
+        The body is only downloaded and decoded for a 200, and text is None
+        for error responses and for bodies over MAX_PAGE_SIZE.
+        """
+        # Rate limiting
+        domain = urlparse(url).netloc
+        await self.rate_limiter.wait_if_needed(domain, rate_limit)
+        
+        # Get proxy if available
+        proxy = None
+        proxy_index = None
+        if self.proxy_manager:
+            proxy_config = self.proxy_manager.get_next_proxy()
+            if proxy_config:
+                proxy = proxy_config.url
+                proxy_index = self.proxy_manager.current_proxy
+        
+        try:
+            async with self.session.get(url, headers=self.get_headers(), proxy=proxy) as response:
+                if response.status != 200:
+                    return response.status, None
+                
+                raw = await self._read_body(response)
+                if raw is None:
+                    logger.warning(f"Page too large (over {MAX_PAGE_SIZE} bytes): {url}")
+                    return response.status, None
+                # Decode with the declared charset rather than letting
+                # aiohttp run charset detection over the whole body
+                try:
+                    content = raw.decode(response.charset or 'utf-8', errors='replace')
+                except LookupError:  # unknown charset in Content-Type
+                    content = raw.decode('utf-8', errors='replace')
+                if proxy_index is not None:
+                    self.proxy_manager.mark_proxy_succeeded(proxy_index)
+                return response.status, content
+        except asyncio.TimeoutError:
+            raise
+        except Exception:
+            # Mark proxy as failed if using proxies
+            if proxy_index is not None:
+                self.proxy_manager.mark_proxy_failed(proxy_index)
+            raise
+    
+    async def fetch_page(self, url: str, company: str, rate_limit: float = 2.0) -> Optional[str]:
+        """Fetch a page with proxy rotation and error handling
+
+        ``rate_limit`` is the average delay in seconds between requests to
+        the page's host; short bursts are allowed by the RateLimiter.
+        """
         max_retries = 3
         
+        if not await self.robots_allows(url, rate_limit):
+            logger.warning(f"robots.txt disallows {url}")
+            return None
+        
         for attempt in range(max_retries):
             try:
-                # Rate limiting
-                domain = urlparse(url).netloc
-                await self.rate_limiter.wait_if_needed(domain, 2.0)
-                
-                # Get proxy if available
-                proxy = None
-                if self.proxy_manager:
-                    proxy_config = self.proxy_manager.get_next_proxy()
-                    if proxy_config:
-                        proxy = proxy_config.url
-                
-                headers = self.get_headers()
-                
-                async with self.session.get(url, headers=headers, proxy=proxy) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        logger.info(f"Successfully fetched {url}")
-                        return content
-                    elif response.status == 429:  # Rate limited
-                        wait_time = 2 ** attempt
-                        logger.warning(f"Rate limited for {url}, waiting {wait_time}s")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        logger.warning(f"HTTP {response.status} for {url}")
-                        
+                status, content = await self._request(url, rate_limit)
+                if status == 200:
+                    if content is not None:
+                        logger.info("Successfully fetched %s", url)
+                    return content
+                elif status == 429:  # Rate limited
+                    wait_time = 2 ** attempt
+                    logger.warning(f"Rate limited for {url}, waiting {wait_time}s")
+                    await asyncio.sleep(wait_time)
+                else:
+                    logger.warning(f"HTTP {status} for {url}")
+                    
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout for {url} (attempt {attempt + 1})")
             except Exception as e:
                 logger.error(f"Error fetching {url}: {e}")
-                
-                # Mark proxy as failed if using proxies
-                if self.proxy_manager and proxy:
-                    proxy_index = self.proxy_manager.current_proxy
-                    self.proxy_manager.mark_proxy_failed(proxy_index)
             
             # Exponential backoff
             if attempt < max_retries - 1:
@@ -333,101 +752,45 @@ class JobScraper:
         
         return None
     
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse) -> Optional[bytes]:
+        """Stream a response body, or return None if it exceeds MAX_PAGE_SIZE"""
+        if (response.content_length or 0) > MAX_PAGE_SIZE:
+            return None
+        
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(PAGE_CHUNK_SIZE):
+            body += chunk
+            if len(body) > MAX_PAGE_SIZE:
+                return None
+        return bytes(body)
+    
     def extract_jobs_generic(self, html: str, company: Company) -> List[Job]:
         """Generic job extraction using CSS selectors"""
-        jobs = []
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        try:
-            # Find job containers
-            job_containers = soup.select(company.selectors.get('job_container', '.job, .position, .opening'))
-            
-            for container in job_containers:
-                try:
-                    # Extract basic job information
-                    title_elem = container.select_one(company.selectors.get('title', 'h1, h2, h3, .title, .job-title'))
-                    title = title_elem.get_text(strip=True) if title_elem else "Unknown"
-                    
-                    location_elem = container.select_one(company.selectors.get('location', '.location, .job-location'))
-                    location = location_elem.get_text(strip=True) if location_elem else "Unknown"
-                    
-                    description_elem = container.select_one(company.selectors.get('description', '.description, .job-description'))
-                    description = description_elem.get_text(strip=True) if description_elem else ""
-                    
-                    # Try to find job URL
-                    link_elem = container.select_one('a[href]')
-                    job_url = urljoin(company.base_url, link_elem['href']) if link_elem else company.career_url
-                    
-                    # Generate job ID
-                    job_id = f"{company.name.lower().replace(' ', '_')}_{hash(title + location) % 10000}"
-                    
-                    # Extract salary if available
-                    salary_text = ""
-                    salary_elem = container.select_one(company.selectors.get('salary', '.salary, .compensation'))
-                    if salary_elem:
-                        salary_text = salary_elem.get_text(strip=True)
-                    
-                    salary_min, salary_max = self.extract_salary(salary_text)
-                    
-                    job = Job(
-                        id=job_id,
-                        title=title,
-                        company=company.name,
-                        location=location,
-                        description=description[:1000],  # Truncate for storage
-                        url=job_url,
-                        posted_date=datetime.now().isoformat(),
-                        salary_min=salary_min,
-                        salary_max=salary_max
-                    )
-                    
-                    jobs.append(job)
-                    
-                except Exception as e:
-                    logger.warning(f"Error extracting job from container: {e}")
-                    continue
-        
-        except Exception as e:
-            logger.error(f"Error parsing jobs for {company.name}: {e}")
-        
-        return jobs
+        return extract_jobs(html, company)
     
     def extract_salary(self, salary_text: str) -> tuple[Optional[int], Optional[int]]:
         """Extract salary range from text"""
-        if not salary_text:
-            return None, None
-        
-        # Common salary patterns
-        patterns = [
-            r'[\$£€](\d+),?(\d+)?k?\s*-\s*[\$£€]?(\d+),?(\d+)?k?',  # $100k - $150k
-            r'(\d+),?(\d+)?\s*-\s*(\d+),?(\d+)?\s*k',  # 100 - 150k
-            r'[\$£€](\d+),?(\d+)',  # $100,000
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, salary_text, re.IGNORECASE)
-            if match:
-                try:
-                    groups = match.groups()
-                    if len(groups) >= 3:  # Range format
-                        min_sal = int(groups[0] + (groups[1] or ''))
-                        max_sal = int(groups[2] + (groups[3] or ''))
-                        
-                        # Handle 'k' notation
-                        if 'k' in salary_text.lower():
-                            min_sal *= 1000
-                            max_sal *= 1000
-                        
-                        return min_sal, max_sal
-                    else:  # Single value
-                        salary = int(groups[0] + (groups[1] or ''))
-                        if 'k' in salary_text.lower():
-                            salary *= 1000
-                        return salary, salary
-                except ValueError:
-                    continue
+        return extract_salary(salary_text)
+    
+    async def _extract_jobs(self, html: str, company: Company) -> List[Job]:
+        """Run extract_jobs in the parse pool (or inline), replacing the pool once if it broke"""
+        if self._parse_pool is None:
+            return extract_jobs(html, company)
         
-        return None, None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._parse_pool, extract_jobs, html, company)
+        except BrokenProcessPool:
+            # A worker died (OOM, crash in a C parser, killed); the cached pool
+            # is unusable from now on, so drop it unless another scrape already has
+            broken = self._parse_pool
+            if get_parse_pool(self.parse_workers) is broken:
+                logger.warning("Parse worker died; starting a new process pool")
+                get_parse_pool.cache_clear()
+                broken.shutdown(wait=False)
+            self._parse_pool = get_parse_pool(self.parse_workers)
+            return await loop.run_in_executor(self._parse_pool, extract_jobs, html, company)
     
     async def scrape_company(self, company: Company) -> List[Job]:
         """Scrape jobs from a single company"""
@@ -435,112 +798,297 @@ class JobScraper:
         jobs = []
         
         try:
-            logger.info(f"Starting scrape for {company.name}")
+            logger.info("Starting scrape for %s", company.name)
             
             # Fetch main career page
-            html = await self.fetch_page(company.career_url, company.name)
+            html = await self.fetch_page(company.career_url, company.name, company.rate_limit)
             if not html:
                 raise Exception("Failed to fetch career page")
             
-            # Extract jobs
-            jobs = self.extract_jobs_generic(html, company)
+            # Extract jobs in a worker process so other fetches keep running
+            jobs = await self._extract_jobs(html, company)
             
-            # Save jobs to database
-            saved_count = 0
+            # Hand jobs to the background writer, once per job per run
             for job in jobs:
-                if self.db_manager.save_job(job):
-                    saved_count += 1
-            
-            duration = time.time() - start_time
+                if job.id not in self.scraped_job_ids:
+                    self.scraped_job_ids.add(job.id)
+                    self._job_queue.put_nowait(job)
             
             # Log successful scrape
-            self.db_manager.log_scrape_session(
-                company=company.name,
-                url=company.career_url,
-                status="success",
-                jobs_found=len(jobs),
-                started_at=datetime.fromtimestamp(start_time).isoformat(),
-                completed_at=datetime.now().isoformat(),
-                duration=duration
-            )
+            self._record_scrape_session(company, "success", start_time, jobs_found=len(jobs))
             
-            logger.info(f"Successfully scraped {len(jobs)} jobs from {company.name} (saved {saved_count})")
+            logger.info("Successfully scraped %d jobs from %s", len(jobs), company.name)
             
         except Exception as e:
-            duration = time.time() - start_time
-            error_msg = str(e)
-            
             # Log failed scrape
-            self.db_manager.log_scrape_session(
-                company=company.name,
-                url=company.career_url,
-                status="failed",
-                error_message=error_msg,
-                started_at=datetime.fromtimestamp(start_time).isoformat(),
-                completed_at=datetime.now().isoformat(),
-                duration=duration
-            )
+            self._record_scrape_session(company, "failed", start_time, error_message=str(e))
             
             logger.error(f"Failed to scrape {company.name}: {e}")
         
         return jobs
     
-    async def scrape_all_companies(self) -> Dict[str, List[Job]]:
-        """Scrape jobs from all companies"""
-        results = {}
-        
-        # Create semaphore to limit concurrent requests
-        semaphore = asyncio.Semaphore(3)  # Max 3 concurrent scrapes
+    async def scrape_all_companies(self, max_concurrent: int = 3) -> ScrapeResult:
+        """Scrape jobs from all companies, at most max_concurrent at a time"""
+        # Pre-fill so results keep the configured company order
+        results = ScrapeResult()
+        for company in self.companies:
+            results.add(company.name, [])
         
-        async def scrape_with_semaphore(company):
-            async with semaphore:
-                return await self.scrape_company(company)
+        # A fixed pool of workers drains the queue, so only max_concurrent
+        # coroutines exist however many companies are configured
+        queue = asyncio.Queue()
+        for company in self.companies:
+            queue.put_nowait(company)
         
-        # Run scraping tasks
-        tasks = [scrape_with_semaphore(company) for company in self.companies]
-        company_results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def worker():
+            while not queue.empty():
+                company = queue.get_nowait()
+                try:
+                    results.add(company.name, await self.scrape_company(company))
+                except Exception as e:
+                    logger.error(f"Exception for {company.name}: {e}")
         
-        # Process results
-        for company, result in zip(self.companies, company_results):
-            if isinstance(result, Exception):
-                logger.error(f"Exception for {company.name}: {result}")
-                results[company.name] = []
-            else:
-                results[company.name] = result
+        await asyncio.gather(*(worker() for _ in range(min(max_concurrent, queue.qsize()))))
+        await self.flush_scrape_sessions()
         
         return results
 
-def load_companies_from_json(file_path: str) -> List[Company]:
-    """Load companies configuration from JSON file"""
+def extract_jobs(html: str, company: Company) -> List[Job]:
+    """Generic job extraction using CSS selectors
+
+    A plain module-level function of picklable arguments, so JobScraper can
+    run it in a worker process.
+    """
+    jobs = []
+    
     try:
-        with open(file_path, 'r') as f:
-            companies_data = json.load(f)
+        selectors = {**DEFAULT_SELECTORS, **company.selectors}
         
-        companies = []
-        for company_data in companies_data:
-            company = Company(**company_data)
-            companies.append(company)
+        job_fields = None
+        if LexborHTMLParser is not None:
+            try:
+                job_fields = _job_fields_selectolax(html, selectors)
+            except Exception as e:
+                logger.debug("selectolax failed for %s, using BeautifulSoup: %s", company.name, e)
+        if job_fields is None:
+            job_fields = _job_fields_bs4(html, selectors)
         
-        return companies
+        for title, location, description, href, salary_text in job_fields:
+            try:
+                # Generate a job ID that is stable across runs (the builtin
+                # hash() is randomized per process), so re-scrapes replace rows
+                digest = hashlib.blake2b(f"{title}|{location}".encode(), digest_size=8).hexdigest()
+                job_id = f"{company.name.lower().replace(' ', '_')}_{digest}"
+                
+                # Try to find job URL; jobs without a link point at the career
+                # page, tagged with their ID since jobs.url is UNIQUE and would
+                # otherwise make each link-less job replace the previous one
+                if href is not None:
+                    job_url = urljoin(company.base_url, href)
+                else:
+                    job_url = f"{company.career_url}#{digest}"
+                
+                # Extract salary if available
+                salary_min, salary_max = extract_salary(salary_text)
+                
+                job = Job(
+                    id=job_id,
+                    title=title,
+                    company=company.name,
+                    location=location,
+                    description=description[:DESCRIPTION_MAX_LENGTH],  # Truncate for storage
+                    url=job_url,
+                    posted_date=datetime.now().isoformat(),
+                    salary_min=salary_min,
+                    salary_max=salary_max
+                )
+                
+                jobs.append(job)
+            
+            except Exception as e:
+                logger.warning("Error extracting job from container: %s", e)
+                continue
+    
     except Exception as e:
-        logger.error(f"Error loading companies from {file_path}: {e}")
-        return []
+        logger.error(f"Error parsing jobs for {company.name}: {e}")
+    
+    return jobs
+
+def _job_fields_selectolax(html: str, selectors: Dict[str, str]) -> List[tuple]:
+    """(title, location, description, href, salary_text) per job container, via selectolax (Lexbor)"""
+    def text(node, default):
+        return node.text(strip=True) if node is not None else default
+    
+    fields = []
+    for container in LexborHTMLParser(html).css(selectors['job_container']):
+        link_elem = container.css_first('a[href]')
+        fields.append((
+            text(container.css_first(selectors['title']), "Unknown"),
+            text(container.css_first(selectors['location']), "Unknown"),
+            # selectolax builds the text in C, so plain slicing is cheap here
+            text(container.css_first(selectors['description']), "")[:DESCRIPTION_MAX_LENGTH],
+            link_elem.attributes.get('href') if link_elem is not None else None,
+            text(container.css_first(selectors['salary']), ""),
+        ))
+    return fields
+
+def _job_fields_bs4(html: str, selectors: Dict[str, str]) -> List[tuple]:
+    """(title, location, description, href, salary_text) per job container, via BeautifulSoup"""
+    def text(elem, default):
+        return elem.get_text(strip=True) if elem else default
+    
+    def description(elem):
+        # Same text as get_text(strip=True), but stops walking the element
+        # once enough is collected for the stored description
+        return truncated_text(elem.stripped_strings, DESCRIPTION_MAX_LENGTH) if elem else ""
+    
+    # Compiled selectors are cached, so each selector string is only parsed once
+    title_sel = compile_selector(selectors['title'])
+    location_sel = compile_selector(selectors['location'])
+    description_sel = compile_selector(selectors['description'])
+    salary_sel = compile_selector(selectors['salary'])
+    link_sel = compile_selector('a[href]')
+    
+    fields = []
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for container in compile_selector(selectors['job_container']).select(soup):
+        try:
+            link_elem = link_sel.select_one(container)
+            fields.append((
+                text(title_sel.select_one(container), "Unknown"),
+                text(location_sel.select_one(container), "Unknown"),
+                description(description_sel.select_one(container)),
+                link_elem['href'] if link_elem else None,
+                text(salary_sel.select_one(container), ""),
+            ))
+        except Exception as e:
+            logger.warning("Error extracting job from container: %s", e)
+    return fields
 
-def load_proxies_from_json(file_path: str) -> List[ProxyConfig]:
-    """Load proxy configuration from JSON file"""
+def truncated_text(strings: Iterable[str], limit: int) -> str:
+    """Join strings until at least limit characters are collected, truncated to limit"""
+    parts = []
+    length = 0
+    for s in strings:
+        parts.append(s)
+        length += len(s)
+        if length >= limit:
+            break
+    return "".join(parts)[:limit]
+
+def _salary_amount(digits: str, separated: Optional[str], k_suffix: Optional[str]) -> int:
+    """Value of one matched salary number; only its own 'k' suffix scales it"""
+    amount = int(digits + (separated or ''))
+    return amount * 1000 if k_suffix else amount
+
+def extract_salary(salary_text: str) -> tuple[Optional[int], Optional[int]]:
+    """Extract salary range from text"""
+    if not salary_text:
+        return None, None
+    
+    for pattern in SALARY_PATTERNS:
+        match = pattern.search(salary_text)
+        if match:
+            try:
+                groups = match.groups()
+                if len(groups) == 6:  # Range format
+                    min_sal = _salary_amount(*groups[:3])
+                    max_sal = _salary_amount(*groups[3:])
+                    # '100 - 150k': a 'k' on the upper bound covers a bare lower one
+                    if groups[5] and not groups[2] and min_sal < 1000:
+                        min_sal *= 1000
+                    return min_sal, max_sal
+                else:  # Single value
+                    salary = _salary_amount(*groups)
+                    return salary, salary
+            except ValueError:
+                continue
+    
+    return None, None
+
+@functools.lru_cache(maxsize=None)
+def get_parse_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool for extract_jobs, created once per process and worker count
+
+    If a worker dies the pool is broken for good; JobScraper then clears this
+    cache and retries on a new pool.
+
+    Workers start from a forkserver (spawn where that's unavailable) rather
+    than being forked from this process, whose aiohttp resolver and sqlite
+    writer threads could leave locks held in the child. Pending work is
+    joined by concurrent.futures at interpreter exit.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+@functools.lru_cache(maxsize=None)
+def insert_jobs_sql(row_count: int) -> str:
+    """INSERT statement for row_count jobs; at most INSERT_JOB_CHUNK distinct strings are built"""
+    return INSERT_JOB_SQL + ", ".join([JOB_ROW_PLACEHOLDERS] * row_count)
+
+@functools.lru_cache(maxsize=256)
+def compile_selector(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector once and reuse it for every page and container"""
+    return soupsieve.compile(selector)
+
+def _current_umask() -> int:
+    """Read the process umask (os.umask can only be read by setting it)"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# Read once at import, before any worker threads could race on os.umask
+UMASK = _current_umask()
+
+def _replacement_mode(file_path: str) -> int:
+    """Permissions for a file written over file_path
+
+    An existing file keeps its mode (so a 0600 config stays private); a new
+    one gets what open() would have given it under the umask.
+    """
     try:
-        with open(file_path, 'r') as f:
-            proxies_data = json.load(f)
-        
-        proxies = []
-        for proxy_data in proxies_data:
-            proxy = ProxyConfig(**proxy_data)
-            proxies.append(proxy)
-        
-        return proxies
-    except Exception as e:
-        logger.error(f"Error loading proxies from {file_path}: {e}")
-        return []
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+@contextmanager
+def atomic_write(file_path: str, fsync: bool = False, **open_kwargs):
+    """Open a temporary file for writing and move it over file_path on success
+
+    Readers never see a half-written file: if the body raises, the target is
+    left untouched and the temporary file is removed. Pass ``fsync=True`` to
+    flush the data to disk before the rename.
+    """
+    tmp = tempfile.NamedTemporaryFile(
+        mode='w', dir=os.path.dirname(file_path) or '.', delete=False,
+        buffering=WRITE_BUFFER_SIZE, **open_kwargs
+    )
+    try:
+        with tmp:
+            yield tmp
+            if fsync:
+                tmp.flush()
+                os.fsync(tmp.fileno())
+        os.chmod(tmp.name, _replacement_mode(file_path))
+        os.replace(tmp.name, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+def write_json_array(file_path: str, items: Iterable) -> int:
+    """Stream items to a JSON array file one element at a time, returning the count"""
+    count = 0
+    with atomic_write(file_path) as f:
+        f.write('[')
+        for item in items:
+            f.write(',\n' if count else '\n')
+            f.write(json.dumps(item, default=str))
+            count += 1
+        f.write('\n]\n')
+    return count
 
 async def main():
     """Main scraping function"""
@@ -585,12 +1133,11 @@ async def main():
     async with JobScraper(companies, proxies) as scraper:
         results = await scraper.scrape_all_companies()
         
-        total_jobs = sum(len(jobs) for jobs in results.values())
-        logger.info(f"Scraping completed. Total jobs found: {total_jobs}")
+        logger.info(f"Scraping completed. Total jobs found: {results.total}")
         
         # Print summary
-        for company_name, jobs in results.items():
-            print(f"{company_name}: {len(jobs)} jobs")
+        for company_name, job_count in results.counts.items():
+            print(f"{company_name}: {job_count} jobs")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Job Portal configuration
+Company and proxy records and their JSON loaders. Only the standard library
+(plus optional orjson) is imported here, so commands that just read the
+configuration don't pay for loading the HTTP/parsing stack.
+"""
+
+import functools
+import json
+import logging
+import os
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# orjson encodes/decodes several times faster than the stdlib json module;
+# json_dumps/json_loads use it when installed. Both produce compact JSON
+try:
+    import orjson
+    
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+    
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = functools.partial(json.dumps, separators=(',', ':'))
+    json_loads = json.loads
+
+@dataclass(slots=True)
+class Company:
+    """Data class representing a company"""
+    name: str
+    career_url: str
+    base_url: str
+    selectors: Dict[str, str]
+    rate_limit: float = 2.0  # seconds between requests
+    last_scraped: Optional[str] = None
+
+@dataclass(slots=True)
+class ProxyConfig:
+    """Proxy configuration"""
+    host: str
+    port: int
+    username: Optional[str] = None
+    password: Optional[str] = None
+    protocol: str = 'http'
+    
+    @property
+    def url(self) -> str:
+        if self.username and self.password:
+            return f"{self.protocol}://{self.username}:{self.password}@{self.host}:{self.port}"
+        return f"{self.protocol}://{self.host}:{self.port}"
+
+def load_companies_from_json(file_path: str) -> List[Company]:
+    """Load companies configuration from JSON file
+
+    Parsed configurations are cached per file and reused until its
+    modification time or size changes. Each call returns fresh copies, so
+    callers may modify them without affecting later loads.
+    """
+    try:
+        cached = _load_companies_cached(file_path, file_signature(file_path))
+        return [replace(company, selectors=dict(company.selectors)) for company in cached]
+    except Exception as e:
+        logger.error(f"Error loading companies from {file_path}: {e}")
+        return []
+
+def load_proxies_from_json(file_path: str) -> List[ProxyConfig]:
+    """Load proxy configuration from JSON file (cached like load_companies_from_json)"""
+    try:
+        return [replace(proxy) for proxy in _load_proxies_cached(file_path, file_signature(file_path))]
+    except Exception as e:
+        logger.error(f"Error loading proxies from {file_path}: {e}")
+        return []
+
+def file_signature(file_path: str) -> tuple:
+    """Return (mtime_ns, size) for a file, used to detect changes to cached data"""
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+@functools.lru_cache(maxsize=8)
+def _load_companies_cached(file_path: str, signature: tuple) -> tuple:
+    with open(file_path, 'rb') as f:
+        companies_data = json_loads(f.read())
+    return tuple(Company(**company_data) for company_data in companies_data)
+
+@functools.lru_cache(maxsize=8)
+def _load_proxies_cached(file_path: str, signature: tuple) -> tuple:
+    with open(file_path, 'rb') as f:
+        proxies_data = json_loads(f.read())
+    return tuple(ProxyConfig(**proxy_data) for proxy_data in proxies_data)
@@ -0,0 +1,35 @@
+"""
+Tests for the scraping engine's parsing helpers
+"""
+
+import pytest
+
+from scraper import extract_salary
+
+
+@pytest.mark.parametrize("salary_text, expected", [
+    ("$100,000", (100000, 100000)),
+    ("$100000", (100000, 100000)),
+    ("$85k", (85000, 85000)),
+    ("$100k - $150k", (100000, 150000)),
+    ("$80,000 - $120,000", (80000, 120000)),
+    ("100 - 150k", (100000, 150000)),
+    ("100k - 150k", (100000, 150000)),
+    ("€60,000 - €75,000 per year", (60000, 75000)),
+])
+def test_extract_salary_formats(salary_text, expected):
+    assert extract_salary(salary_text) == expected
+
+
+@pytest.mark.parametrize("salary_text, expected", [
+    ("$50,000 + 401k match", (50000, 50000)),
+    ("$50,000 base, 5k bonus", (50000, 50000)),
+    ("Pakistan $50,000", (50000, 50000)),
+])
+def test_extract_salary_ignores_unrelated_k(salary_text, expected):
+    assert extract_salary(salary_text) == expected
+
+
+@pytest.mark.parametrize("salary_text", ["", "Competitive", "Salary negotiable"])
+def test_extract_salary_without_amount(salary_text):
+    assert extract_salary(salary_text) == (None, None)
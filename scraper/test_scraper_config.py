@@ -0,0 +1,25 @@
+"""
+Tests for configuration loading
+"""
+
+import json
+
+from scraper_config import load_companies_from_json
+
+
+def test_loaded_companies_are_independent_copies(tmp_path):
+    path = tmp_path / "companies.json"
+    path.write_text(json.dumps([{
+        "name": "Acme",
+        "career_url": "https://acme.example/jobs",
+        "base_url": "https://acme.example",
+        "selectors": {"title": "h3"}
+    }]))
+    
+    first = load_companies_from_json(str(path))
+    first[0].last_scraped = "2024-01-01T00:00:00"
+    first[0].selectors["title"] = ".changed"
+    
+    second = load_companies_from_json(str(path))
+    assert second[0].last_scraped is None
+    assert second[0].selectors == {"title": "h3"}